@@ -10,34 +10,91 @@ import json
 import re
 import time
 import shutil
+import shelve
+import hashlib
+import functools
+import importlib.util
+from operator import itemgetter
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from pathlib import Path
-import pandas as pd
-from openpyxl import load_workbook
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 
 # Third-party imports
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
     from bs4 import BeautifulSoup
-    from langchain_community.embeddings import HuggingFaceEmbeddings
-    from langchain_openai import ChatOpenAI, AzureChatOpenAI
-    from langchain_community.document_loaders import TextLoader
-    from langchain_text_splitters import RecursiveCharacterTextSplitter
-    from langchain_community.vectorstores import FAISS
-    from langchain_core.prompts import ChatPromptTemplate
-    from langchain_core.output_parsers import StrOutputParser
+    from lxml import html as lxml_html
     import psycopg2
+    from psycopg2.extras import execute_values
+    # The LangChain/FAISS stack takes seconds to import, so it is imported inside the
+    # functions that use it; here we only confirm it is installed
+    for module_name in ('langchain_community', 'langchain_openai', 'langchain_text_splitters',
+                        'langchain_core', 'faiss', 'numpy'):
+        if importlib.util.find_spec(module_name) is None:
+            raise ImportError(f"No module named '{module_name}'")
     print("✅ All imports successful")
 except ImportError as e:
     print(f"❌ Import error: {e}")
     print("\n📦 Please install required packages:")
     print("pip install requests beautifulsoup4 langchain-community langchain-openai")
     print("pip install langchain-text-splitters faiss-cpu sentence-transformers openai")
-    print("pip install pandas openpyxl psycopg2-binary")
+    print("pip install openpyxl psycopg2-binary")
     sys.exit(1)
 
+if TYPE_CHECKING:
+    import numpy as np
+    from langchain_core.documents import Document
+    from langchain_community.vectorstores import FAISS
+
+# Optional fast HTML parser (falls back to BeautifulSoup when not installed)
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        HTMLParser = None
+
+# Optional persistent HTTP cache (filings are immutable once published)
+try:
+    from requests_cache import CachedSession, DO_NOT_CACHE, NEVER_EXPIRE
+except ImportError:
+    CachedSession = None
+
+# Optional fast Excel writer (falls back to openpyxl's write-only mode)
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+# Optional fast JSON library; its JSONDecodeError subclasses json.JSONDecodeError
+try:
+    import orjson
+    json_loads = orjson.loads
+    
+    def json_dumps_bytes(obj) -> bytes:
+        """Serialize to indented UTF-8 JSON"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    json_loads = json.loads
+    
+    # Built once: json.dumps(indent=2) constructs a new encoder on every call.
+    # ensure_ascii=False writes text as UTF-8, matching orjson's output
+    JSON_INDENT_ENCODER = json.JSONEncoder(indent=2, ensure_ascii=False)
+    
+    def json_dumps_bytes(obj) -> bytes:
+        """Serialize to indented UTF-8 JSON"""
+        return JSON_INDENT_ENCODER.encode(obj).encode('utf-8')
+
 # Environment setup
 os.environ['TOKENIZERS_PARALLELISM'] = "False"
 
@@ -45,6 +102,7 @@ os.environ['TOKENIZERS_PARALLELISM'] = "False"
 DIRS = {
     "extracted": Path("data/extracted"),
     "debug": Path("data/debug"),
+    "cache": Path("data/cache"),
     "output": Path("output")
 }
 
@@ -134,165 +192,209 @@ def get_db_connection(config: Dict[str, object]):
         print(f"❌ Database connection failed: {e}")
         return None
 
+# All tables are created in a single round-trip
+DATABASE_SCHEMA = """
+    -- Table 1: Company Summary
+    CREATE TABLE IF NOT EXISTS company_summary (
+        id SERIAL PRIMARY KEY,
+        ticker VARCHAR(10) NOT NULL,
+        cik VARCHAR(20),
+        company_name VARCHAR(255),
+        filing_type VARCHAR(10),
+        filing_date DATE,
+        time_period TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(ticker, filing_date, filing_type)
+    );
+
+    -- Table 2: Production Data (Combined Value+Unit Storage)
+    CREATE TABLE IF NOT EXISTS production_data (
+        id SERIAL PRIMARY KEY,
+        ticker VARCHAR(10) NOT NULL,
+        company_name VARCHAR(255),
+        filing_type VARCHAR(10),
+        filing_date DATE,
+        time_period TEXT,
+        quarter VARCHAR(10),
+        year VARCHAR(10),
+        oil_mbbl_per_day VARCHAR(50),
+        ngl_mbbl_per_day VARCHAR(50),
+        gas_mmcf_per_day VARCHAR(50),
+        boe_mboe_per_day VARCHAR(50),
+        oil_mmbls_total VARCHAR(50),
+        ngl_mmbls_total VARCHAR(50),
+        gas_bcf_total VARCHAR(50),
+        boe_mmboe_total VARCHAR(50),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(ticker, filing_date, filing_type)
+    );
+
+    -- Table 3: Activity & Well Information (Combined Value+Unit Storage)
+    CREATE TABLE IF NOT EXISTS activity_wells (
+        id SERIAL PRIMARY KEY,
+        ticker VARCHAR(10) NOT NULL,
+        company_name VARCHAR(255),
+        filing_type VARCHAR(10),
+        filing_date DATE,
+        quarter VARCHAR(10),
+        year VARCHAR(10),
+        drilling_rigs VARCHAR(50),
+        gross_wells_drilled VARCHAR(50),
+        gross_wells_completed VARCHAR(50),
+        gross_wells_til VARCHAR(50),
+        net_wells_til VARCHAR(50),
+        avg_lateral_length_drilled VARCHAR(50),
+        avg_lateral_length_completed VARCHAR(50),
+        working_interest_percent VARCHAR(50),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(ticker, filing_date, filing_type)
+    );
+
+    -- Table 4: Revenue Data (Combined Value+Unit Storage)
+    CREATE TABLE IF NOT EXISTS revenue_data (
+        id SERIAL PRIMARY KEY,
+        ticker VARCHAR(10) NOT NULL,
+        company_name VARCHAR(255),
+        filing_type VARCHAR(10),
+        filing_date DATE,
+        quarter VARCHAR(10),
+        year VARCHAR(10),
+        oil_revenue VARCHAR(50),
+        ngl_revenue VARCHAR(50),
+        gas_revenue VARCHAR(50),
+        total_revenue VARCHAR(50),
+        revenue_per_boe VARCHAR(50),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(ticker, filing_date, filing_type)
+    );
+
+    -- Table 5: Realized Pricing (Combined Value+Unit Storage)
+    CREATE TABLE IF NOT EXISTS realized_prices (
+        id SERIAL PRIMARY KEY,
+        ticker VARCHAR(10) NOT NULL,
+        company_name VARCHAR(255),
+        filing_type VARCHAR(10),
+        filing_date DATE,
+        quarter VARCHAR(10),
+        year VARCHAR(10),
+        oil_price VARCHAR(50),
+        ngl_price VARCHAR(50),
+        gas_price VARCHAR(50),
+        boe_price VARCHAR(50),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(ticker, filing_date, filing_type)
+    );
+
+    -- Table 6: Cost Data (Combined Value+Unit Storage)
+    CREATE TABLE IF NOT EXISTS cost_data (
+        id SERIAL PRIMARY KEY,
+        ticker VARCHAR(10) NOT NULL,
+        company_name VARCHAR(255),
+        filing_type VARCHAR(10),
+        filing_date DATE,
+        quarter VARCHAR(10),
+        year VARCHAR(10),
+        production_cost_per_boe VARCHAR(50),
+        lease_operating_expense_per_boe VARCHAR(50),
+        transportation_cost_per_boe VARCHAR(50),
+        production_taxes_per_boe VARCHAR(50),
+        development_capex VARCHAR(50),
+        exploration_capex VARCHAR(50),
+        total_capex VARCHAR(50),
+        ddna_per_boe VARCHAR(50),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(ticker, filing_date, filing_type)
+    );
+
+    -- Table 7: Basin Data (Combined Value+Unit Storage)
+    CREATE TABLE IF NOT EXISTS basin_data (
+        id SERIAL PRIMARY KEY,
+        ticker VARCHAR(10) NOT NULL,
+        company_name VARCHAR(255),
+        sec_filing_date DATE,
+        file_type VARCHAR(10),
+        basin_name VARCHAR(100),
+        
+        -- Gas Production (combined value+unit as text)
+        gas_reserves VARCHAR(50),
+        gas_per_day VARCHAR(50),
+        
+        -- Oil Production (combined value+unit as text)
+        oil_reserves VARCHAR(50),
+        oil_per_day VARCHAR(50),
+        
+        -- NGL Production (combined value+unit as text)
+        ngl_reserves VARCHAR(50),
+        ngl_per_day VARCHAR(50),
+        
+        -- Total BOE (combined value+unit as text)
+        total_boe VARCHAR(50),
+        boe_per_day VARCHAR(50),
+        
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(ticker, sec_filing_date, file_type, basin_name)
+    );
+
+    -- Numeric value of every metric; the text columns keep the as-reported value with its unit
+    ALTER TABLE production_data
+        ADD COLUMN IF NOT EXISTS oil_mbbl_per_day_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS ngl_mbbl_per_day_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS gas_mmcf_per_day_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS boe_mboe_per_day_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS oil_mmbls_total_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS ngl_mmbls_total_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS gas_bcf_total_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS boe_mmboe_total_value DOUBLE PRECISION;
+
+    ALTER TABLE activity_wells
+        ADD COLUMN IF NOT EXISTS drilling_rigs_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS gross_wells_drilled_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS gross_wells_completed_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS gross_wells_til_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS net_wells_til_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS avg_lateral_length_drilled_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS avg_lateral_length_completed_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS working_interest_percent_value DOUBLE PRECISION;
+
+    ALTER TABLE revenue_data
+        ADD COLUMN IF NOT EXISTS oil_revenue_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS ngl_revenue_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS gas_revenue_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS total_revenue_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS revenue_per_boe_value DOUBLE PRECISION;
+
+    ALTER TABLE realized_prices
+        ADD COLUMN IF NOT EXISTS oil_price_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS ngl_price_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS gas_price_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS boe_price_value DOUBLE PRECISION;
+
+    ALTER TABLE cost_data
+        ADD COLUMN IF NOT EXISTS production_cost_per_boe_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS lease_operating_expense_per_boe_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS transportation_cost_per_boe_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS production_taxes_per_boe_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS development_capex_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS exploration_capex_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS total_capex_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS ddna_per_boe_value DOUBLE PRECISION;
+
+    ALTER TABLE basin_data
+        ADD COLUMN IF NOT EXISTS gas_reserves_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS gas_per_day_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS oil_reserves_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS oil_per_day_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS ngl_reserves_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS ngl_per_day_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS total_boe_value DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS boe_per_day_value DOUBLE PRECISION;
+"""
+
 def create_database_tables(conn):
     """Create all necessary database tables."""
     try:
         cursor = conn.cursor()
-        
-        # Table 1: Company Summary
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS company_summary (
-                id SERIAL PRIMARY KEY,
-                ticker VARCHAR(10) NOT NULL,
-                cik VARCHAR(20),
-                company_name VARCHAR(255),
-                filing_type VARCHAR(10),
-                filing_date DATE,
-                time_period TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(ticker, filing_date, filing_type)
-            );
-        """)
-        
-        # Table 2: Production Data (Combined Value+Unit Storage)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS production_data (
-                id SERIAL PRIMARY KEY,
-                ticker VARCHAR(10) NOT NULL,
-                company_name VARCHAR(255),
-                filing_type VARCHAR(10),
-                filing_date DATE,
-                time_period TEXT,
-                quarter VARCHAR(10),
-                year VARCHAR(10),
-                oil_mbbl_per_day VARCHAR(50),
-                ngl_mbbl_per_day VARCHAR(50),
-                gas_mmcf_per_day VARCHAR(50),
-                boe_mboe_per_day VARCHAR(50),
-                oil_mmbls_total VARCHAR(50),
-                ngl_mmbls_total VARCHAR(50),
-                gas_bcf_total VARCHAR(50),
-                boe_mmboe_total VARCHAR(50),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(ticker, filing_date, filing_type)
-            );
-        """)
-        
-        # Table 3: Activity & Well Information (Combined Value+Unit Storage)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS activity_wells (
-                id SERIAL PRIMARY KEY,
-                ticker VARCHAR(10) NOT NULL,
-                company_name VARCHAR(255),
-                filing_type VARCHAR(10),
-                filing_date DATE,
-                quarter VARCHAR(10),
-                year VARCHAR(10),
-                drilling_rigs VARCHAR(50),
-                gross_wells_drilled VARCHAR(50),
-                gross_wells_completed VARCHAR(50),
-                gross_wells_til VARCHAR(50),
-                net_wells_til VARCHAR(50),
-                avg_lateral_length_drilled VARCHAR(50),
-                avg_lateral_length_completed VARCHAR(50),
-                working_interest_percent VARCHAR(50),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(ticker, filing_date, filing_type)
-            );
-        """)
-        
-        # Table 4: Revenue Data (Combined Value+Unit Storage)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS revenue_data (
-                id SERIAL PRIMARY KEY,
-                ticker VARCHAR(10) NOT NULL,
-                company_name VARCHAR(255),
-                filing_type VARCHAR(10),
-                filing_date DATE,
-                quarter VARCHAR(10),
-                year VARCHAR(10),
-                oil_revenue VARCHAR(50),
-                ngl_revenue VARCHAR(50),
-                gas_revenue VARCHAR(50),
-                total_revenue VARCHAR(50),
-                revenue_per_boe VARCHAR(50),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(ticker, filing_date, filing_type)
-            );
-        """)
-        
-        # Table 5: Realized Pricing (Combined Value+Unit Storage)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS realized_prices (
-                id SERIAL PRIMARY KEY,
-                ticker VARCHAR(10) NOT NULL,
-                company_name VARCHAR(255),
-                filing_type VARCHAR(10),
-                filing_date DATE,
-                quarter VARCHAR(10),
-                year VARCHAR(10),
-                oil_price VARCHAR(50),
-                ngl_price VARCHAR(50),
-                gas_price VARCHAR(50),
-                boe_price VARCHAR(50),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(ticker, filing_date, filing_type)
-            );
-        """)
-        
-        # Table 6: Cost Data (Combined Value+Unit Storage)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS cost_data (
-                id SERIAL PRIMARY KEY,
-                ticker VARCHAR(10) NOT NULL,
-                company_name VARCHAR(255),
-                filing_type VARCHAR(10),
-                filing_date DATE,
-                quarter VARCHAR(10),
-                year VARCHAR(10),
-                production_cost_per_boe VARCHAR(50),
-                lease_operating_expense_per_boe VARCHAR(50),
-                transportation_cost_per_boe VARCHAR(50),
-                production_taxes_per_boe VARCHAR(50),
-                development_capex VARCHAR(50),
-                exploration_capex VARCHAR(50),
-                total_capex VARCHAR(50),
-                ddna_per_boe VARCHAR(50),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(ticker, filing_date, filing_type)
-            );
-        """)
-        
-        # Table 7: Basin Data (Combined Value+Unit Storage)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS basin_data (
-                id SERIAL PRIMARY KEY,
-                ticker VARCHAR(10) NOT NULL,
-                company_name VARCHAR(255),
-                sec_filing_date DATE,
-                file_type VARCHAR(10),
-                basin_name VARCHAR(100),
-                
-                -- Gas Production (combined value+unit as text)
-                gas_reserves VARCHAR(50),
-                gas_per_day VARCHAR(50),
-                
-                -- Oil Production (combined value+unit as text)
-                oil_reserves VARCHAR(50),
-                oil_per_day VARCHAR(50),
-                
-                -- NGL Production (combined value+unit as text)
-                ngl_reserves VARCHAR(50),
-                ngl_per_day VARCHAR(50),
-                
-                -- Total BOE (combined value+unit as text)
-                total_boe VARCHAR(50),
-                boe_per_day VARCHAR(50),
-                
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(ticker, sec_filing_date, file_type, basin_name)
-            );
-        """)
+        cursor.execute(DATABASE_SCHEMA)
         
         conn.commit()
         cursor.close()
@@ -308,19 +410,91 @@ def create_database_tables(conn):
 # SEC EDGAR API FUNCTIONS (from main_extractor.py)
 # ============================================================================
 
+def create_http_session() -> requests.Session:
+    """Create an HTTP session with a connection pool shared by all SEC requests.
+
+    Throttling (429) and transient server errors are retried with
+    exponential backoff, honouring Retry-After. When requests-cache is installed, responses are cached on disk without
+    expiry, except for the EDGAR filing listings which change as new filings
+    are published.
+    """
+    if CachedSession is not None:
+        session = CachedSession(
+            str(DIRS['cache'] / 'http_cache'),
+            backend='sqlite',
+            expire_after=NEVER_EXPIRE,
+            urls_expire_after={'*/cgi-bin/browse-edgar': DO_NOT_CACHE},
+            allowable_methods=['GET']
+        )
+    else:
+        session = requests.Session()
+    retries = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retries)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+@dataclass(frozen=True)
 class SECFilingFetcher:
     """Handles fetching and parsing SEC filings"""
     
+    __slots__ = ('cik', 'ticker')
+    cik: str
+    ticker: str
+    
     BASE_URL = "https://www.sec.gov"
     HEADERS = {
         'User-Agent': 'Secfiling_Extraction_Vivek contact@example.com',
         'Accept-Encoding': 'gzip, deflate',
         'Host': 'www.sec.gov'
     }
+    # SEC EDGAR allows at most 10 requests per second
+    MIN_REQUEST_INTERVAL = 0.1
+    
+    # Primary filing documents are .htm/.html; skip index pages, XBRL/data files, images and exhibits
+    _PRIMARY_RE = re.compile(r'\.html?$', re.IGNORECASE)
+    _EXCLUDE_RE = re.compile(
+        r'index\.htm|_htm\.xml|\.(?:xsd|xml|xlsx?|pdf|jpg|gif|png)$|ex\d+|graphic',
+        re.IGNORECASE
+    )
     
-    def __init__(self, cik: str, ticker: str):
-        self.cik = cik.strip().zfill(10)
-        self.ticker = ticker.upper()
+    # Created on first request, so importing the module does not open the HTTP cache
+    _session = None
+    _session_lock = threading.Lock()
+    _rate_lock = threading.Lock()
+    _next_request_time = 0.0
+    
+    def __post_init__(self):
+        # Normalize once at construction; the instance is immutable afterwards
+        object.__setattr__(self, 'cik', self.cik.strip().zfill(10))
+        object.__setattr__(self, 'ticker', self.ticker.upper())
+    
+    @classmethod
+    def get_session(cls) -> requests.Session:
+        """Shared keep-alive session, created once on first use"""
+        if cls._session is None:
+            with cls._session_lock:
+                if cls._session is None:
+                    cls._session = create_http_session()
+        return cls._session
+    
+    @classmethod
+    def http_get(cls, url: str, **kwargs) -> requests.Response:
+        """GET through the shared keep-alive session, throttled to SEC's rate limit"""
+        with cls._rate_lock:
+            now = time.monotonic()
+            wait = cls._next_request_time - now
+            cls._next_request_time = max(now, cls._next_request_time) + cls.MIN_REQUEST_INTERVAL
+        
+        if wait > 0:
+            time.sleep(wait)
+        
+        return cls.get_session().get(url, **kwargs)
         
     def get_filings_list(self, filing_type: str = "10-Q", count: int = 10) -> List[Dict]:
         """Fetch list of available filings from SEC EDGAR"""
@@ -337,30 +511,30 @@ class SECFilingFetcher:
             }
             
             print(f"  → Fetching {filing_type} filings for CIK {self.cik}...")
-            response = requests.get(submissions_url, headers=self.HEADERS, params=params, timeout=30)
+            response = self.http_get(submissions_url, headers=self.HEADERS, params=params, timeout=30)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            tree = lxml_html.fromstring(response.content)
             filings = []
-            table = soup.find('table', {'class': 'tableFile2'})
+            tables = tree.find_class('tableFile2')
             
-            if not table:
+            if not tables:
                 print("  ⚠ No filings table found")
                 return []
             
-            rows = table.find_all('tr')[1:]
+            rows = tables[0].findall('.//tr')[1:]
             
             for row in rows:
-                cols = row.find_all('td')
+                cols = row.findall('.//td')
                 if len(cols) >= 4:
-                    filing_type_cell = cols[0].text.strip()
+                    filing_type_cell = cols[0].text_content().strip()
                     
                     if filing_type_cell == filing_type:
-                        documents_link = cols[1].find('a')
-                        filing_date = cols[3].text.strip()
+                        documents_link = cols[1].find('.//a')
+                        filing_date = cols[3].text_content().strip()
                         
-                        if documents_link:
-                            href = documents_link['href']
+                        if documents_link is not None and documents_link.get('href'):
+                            href = documents_link.get('href')
                             accession = href.split('/')[-1]
                             
                             filings.append({
@@ -382,69 +556,62 @@ class SECFilingFetcher:
         try:
             print(f"  → Fetching documents index page...")
             
-            response = requests.get(documents_url, headers=self.HEADERS, timeout=30)
+            response = self.http_get(documents_url, headers=self.HEADERS, timeout=30)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            doc_table = soup.find('table', {'class': 'tableFile'})
+            tree = lxml_html.fromstring(response.content)
+            doc_tables = tree.find_class('tableFile')
             
-            if not doc_table:
+            if not doc_tables:
                 print("  ✗ Could not find document table")
                 return None
             
-            rows = doc_table.find_all('tr')
-            
-            primary_patterns = [r'\.htm$', r'\.html$']
-            exclude_patterns = [
-                r'index\.htm', r'_htm\.xml', r'\.xsd$', r'\.xml$',
-                r'\.xls$', r'\.xlsx$', r'\.pdf$', r'\.jpg$',
-                r'\.gif$', r'\.png$', r'ex\d+', r'graphic'
-            ]
+            rows = doc_tables[0].findall('.//tr')
             
-            candidate_docs = []
+            # Keep the first link with the highest priority; a filing-type match cannot be beaten
+            best_href = None
+            best_priority = -1
+            filing_key = filing_type.lower().replace('-', '')
+            ticker_key = self.ticker.lower()
             
             for row in rows[1:]:
-                cols = row.find_all('td')
+                cols = row.findall('.//td')
                 if len(cols) >= 3:
-                    doc_link = cols[2].find('a')
-                    if doc_link and doc_link.has_attr('href'):
-                        doc_href = doc_link['href']
+                    doc_link = cols[2].find('.//a')
+                    if doc_link is not None and doc_link.get('href') is not None:
+                        doc_href = doc_link.get('href')
                         
-                        is_primary = any(re.search(pattern, doc_href, re.IGNORECASE) for pattern in primary_patterns)
-                        is_excluded = any(re.search(pattern, doc_href, re.IGNORECASE) for pattern in exclude_patterns)
-                        
-                        if is_primary and not is_excluded:
-                            if doc_href.startswith('http'):
-                                full_url = doc_href
-                            elif doc_href.startswith('/'):
-                                full_url = f"{self.BASE_URL}{doc_href}"
-                            else:
-                                base_path = '/'.join(documents_url.split('/')[:-1])
-                                full_url = f"{base_path}/{doc_href}"
-                            
+                        if self._PRIMARY_RE.search(doc_href) and not self._EXCLUDE_RE.search(doc_href):
+                            href_lower = doc_href.lower()
                             priority = 0
-                            if filing_type.lower().replace('-', '') in doc_href.lower():
+                            if filing_key in href_lower:
                                 priority = 3
-                            elif self.ticker.lower() in doc_href.lower():
+                            elif ticker_key in href_lower:
                                 priority = 2
-                            elif 'htm' in doc_href.lower() and 'xml' not in doc_href.lower():
+                            elif 'htm' in href_lower and 'xml' not in href_lower:
                                 priority = 1
                             
-                            candidate_docs.append({
-                                'url': full_url,
-                                'href': doc_href,
-                                'priority': priority
-                            })
+                            if priority > best_priority:
+                                best_href = doc_href
+                                best_priority = priority
+                                if priority == 3:
+                                    break
             
-            if not candidate_docs:
+            if best_href is None:
                 print("  ✗ No valid document links found")
                 return None
             
-            candidate_docs.sort(key=lambda x: x['priority'], reverse=True)
-            best_doc = candidate_docs[0]
-            print(f"  ✓ Found document: {best_doc['href']}")
+            if best_href.startswith('http'):
+                full_url = best_href
+            elif best_href.startswith('/'):
+                full_url = f"{self.BASE_URL}{best_href}"
+            else:
+                base_path = '/'.join(documents_url.split('/')[:-1])
+                full_url = f"{base_path}/{best_href}"
             
-            return best_doc['url']
+            print(f"  ✓ Found document: {best_href}")
+            
+            return full_url
             
         except Exception as e:
             print(f"  ✗ Error fetching document URL: {e}")
@@ -454,6 +621,26 @@ class SECFilingFetcher:
 # TEXT EXTRACTION
 # ============================================================================
 
+# Inline XBRL wrappers around reported facts; unwrapped so only the fact text remains
+IX_TAG_PATTERN = re.compile(rb'</?ix:non(?:Fraction|Numeric)[^>]*>')
+IX_UNWRAP_TAGS = [r'ix\:nonfraction', r'ix\:nonnumeric']
+
+# Line boundaries str.splitlines() recognizes besides '\n' ('\r\n' becomes a dropped blank line)
+LINE_BREAK_PATTERN = re.compile(r'[\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029]')
+# Stripped content of every line that is longer than one character and not a '//' comment
+TEXT_LINE_PATTERN = re.compile(r'^[^\S\n]*(?!//)(\S[^\n]*\S)[^\S\n]*$', re.MULTILINE)
+MULTI_SPACE_PATTERN = re.compile(r' {2,}')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+SENTENCE_BREAK_PATTERN = re.compile(r'(\. )([A-Z])')
+
+# Bump whenever the HTML-to-text cleanup changes so previously cached text is re-extracted
+EXTRACTOR_VERSION = 1
+
+# Maps sha256(extractor version | document URL) -> path of the text previously extracted from it
+TEXT_CACHE_PATH = DIRS['cache'] / 'extracted_text'
+# dbm files allow one writer at a time; filings may be extracted on parallel threads
+TEXT_CACHE_LOCK = threading.Lock()
+
 def extract_text_from_url(url: str, output_path: Path) -> bool:
     """Extract text content from SEC filing URL"""
     try:
@@ -471,54 +658,73 @@ def extract_text_from_url(url: str, output_path: Path) -> bool:
                 doc_path = query_params['doc'][0]
                 url = f"https://www.sec.gov{doc_path}"
         
+        cache_key = hashlib.sha256(f"{EXTRACTOR_VERSION}|{url}".encode('utf-8')).hexdigest()
+        with TEXT_CACHE_LOCK, shelve.open(str(TEXT_CACHE_PATH)) as text_cache:
+            cached_path = text_cache.get(cache_key)
+        
+        if cached_path and Path(cached_path).is_file():
+            if Path(cached_path).resolve() != output_path.resolve():
+                shutil.copyfile(cached_path, output_path)
+            print(f"  ✓ Using previously extracted text ({Path(cached_path).stat().st_size:,} bytes)")
+            return True
+        
         print(f"  → Downloading filing from SEC...")
-        response = requests.get(url, headers=headers, timeout=60)
-        response.raise_for_status()
+        # Stream the body so decompression overlaps the download
+        with SECFilingFetcher.http_get(url, headers=headers, stream=True, timeout=60) as response:
+            response.raise_for_status()
+            content = b''.join(response.iter_content(chunk_size=65536))
         
-        print(f"  → Parsing HTML ({len(response.content):,} bytes)...")
+        print(f"  → Parsing HTML ({len(content):,} bytes)...")
         
         import warnings
         from bs4 import XMLParsedAsHTMLWarning
         warnings.filterwarnings("ignore", category=XMLParsedAsHTMLWarning)
         
-        response_text = response.text
-        response_text = re.sub(r'<ix:nonFraction[^>]*>(.*?)</ix:nonFraction>', r'\1', response_text, flags=re.DOTALL)
-        response_text = re.sub(r'<ix:nonNumeric[^>]*>(.*?)</ix:nonNumeric>', r'\1', response_text, flags=re.DOTALL)
-        try:
-            soup = BeautifulSoup(response_text, 'lxml')
-        except Exception:
-            print("  ⚠ lxml parser not available, falling back to html.parser")
-            soup = BeautifulSoup(response_text, 'html.parser')
-        
-        for element in soup(['script', 'style', 'meta', 'link', 'noscript', 'head']):
-            element.decompose()
-        
-        body = soup.find('body')
-        if body:
-            text_content = body.get_text(separator='\n', strip=False)
+        # Raw bytes go straight to the parser, which handles decoding
+        if HTMLParser is not None:
+            # Unwrap inline XBRL in the parsed tree rather than rewriting the raw bytes,
+            # then rejoin the fact text with its surrounding sentence
+            tree = HTMLParser(content)
+            tree.unwrap_tags(IX_UNWRAP_TAGS)
+            tree.merge_text_nodes()
+            for element in tree.css('script, style, meta, link, noscript, head'):
+                element.decompose()
+            
+            body = tree.body or tree.root
+            text_content = body.text(separator='\n', strip=False) if body else ''
         else:
-            text_content = soup.get_text(separator='\n', strip=False)
-        
-        lines = []
-        for line in text_content.splitlines():
-            line = line.strip()
-            if line and len(line) > 1 and not line.startswith('//'):
-                lines.append(line)
-        
-        clean_text = '\n'.join(lines)
-        clean_text = re.sub(r'\n{3,}', '\n\n', clean_text)
-        clean_text = re.sub(r' {2,}', ' ', clean_text)
+            html = IX_TAG_PATTERN.sub(b'', content)
+            try:
+                soup = BeautifulSoup(html, 'lxml')
+            except Exception:
+                print("  ⚠ lxml parser not available, falling back to html.parser")
+                soup = BeautifulSoup(html, 'html.parser')
+            
+            for element in soup(['script', 'style', 'meta', 'link', 'noscript', 'head']):
+                element.decompose()
+            
+            body = soup.find('body')
+            if body:
+                text_content = body.get_text(separator='\n', strip=False)
+            else:
+                text_content = soup.get_text(separator='\n', strip=False)
+        
+        # Split on every line boundary splitlines() knows (form feeds, '\r', ...), not just '\n'.
+        # Kept lines are never empty, so no blank-line collapsing is needed after the join
+        text_content = LINE_BREAK_PATTERN.sub('\n', text_content)
+        clean_text = '\n'.join(TEXT_LINE_PATTERN.findall(text_content))
+        clean_text = MULTI_SPACE_PATTERN.sub(' ', clean_text)
         
         if len(clean_text) < 1000:
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(content, 'html.parser')
             for element in soup(['script', 'style', 'meta', 'link', 'noscript', 'head', 'header', 'footer', 'nav']):
                 element.decompose()
             
             text_content = soup.get_text(separator=' ', strip=True)
-            clean_text = re.sub(r'\s+', ' ', text_content)
+            clean_text = WHITESPACE_PATTERN.sub(' ', text_content)
             clean_text = clean_text.replace(' . ', '. ')
             clean_text = clean_text.replace(' , ', ', ')
-            clean_text = re.sub(r'(\. )([A-Z])', r'.\n\2', clean_text)
+            clean_text = SENTENCE_BREAK_PATTERN.sub(r'.\n\2', clean_text)
         
         if len(clean_text) < 1000:
             print(f"  ✗ ERROR: Extraction failed - only {len(clean_text)} characters")
@@ -527,6 +733,9 @@ def extract_text_from_url(url: str, output_path: Path) -> bool:
         with open(output_path, 'w', encoding='utf-8') as f:
             f.write(clean_text)
         
+        with TEXT_CACHE_LOCK, shelve.open(str(TEXT_CACHE_PATH)) as text_cache:
+            text_cache[cache_key] = str(output_path)
+        
         print(f"  ✓ Extracted {len(clean_text):,} characters")
         
         # Save debug sample
@@ -548,33 +757,162 @@ def extract_text_from_url(url: str, output_path: Path) -> bool:
 # RAG PIPELINE
 # ============================================================================
 
-def build_rag_pipeline(document_path: Path, embeddings_model, llm_model):
-    """Build RAG pipeline for document analysis"""
+# Brute-force scan over 8-bit scalar-quantized vectors, a quarter of the memory traffic
+# of fp32. Each index serves a single query, so IVF/PQ indexes (training cost, probes
+# that can miss chunks) are opt-in through RAG_FAISS_INDEX
+FAISS_DEFAULT_INDEX = "SQ8"
+# Inverted lists searched per query when RAG_FAISS_INDEX selects an IVF index
+FAISS_NPROBE = 8
+
+# Character chunking, used when the embedding model does not expose its tokenizer (FastEmbed).
+# ~1024 characters of prose is well inside BGE-small's 512-token window, but dense numeric
+# tables ("1,234.5" is ~5 word pieces) can exceed it and have their tail truncated
+CHUNK_SIZE = 1024
+CHUNK_OVERLAP = 256
+
+# Built vector stores, one directory per (document text, embedding model, index settings)
+VECTOR_STORE_CACHE_DIR = DIRS['cache'] / 'vector_stores'
+
+# Downloaded embedding model weights, kept with the other caches instead of a temp dir
+EMBEDDING_MODEL_CACHE_DIR = DIRS['cache'] / 'models'
+
+# Start of a filing section heading such as "Item 2." or "ITEM 1A."
+SECTION_HEADING_PATTERN = re.compile(r'^(?=item\s+\d+[a-z]?\.)', re.IGNORECASE | re.MULTILINE)
+
+@functools.lru_cache(maxsize=1)
+def load_embeddings_model():
+    """Load the document embedding model (once per process).
+
+    Uses FastEmbed's quantized ONNX BGE-small when fastembed is installed and
+    falls back to sentence-transformers MiniLM otherwise. Both produce
+    384-dimensional vectors. Chunks are encoded RAG_EMBED_BATCH_SIZE at a
+    time (default 64); lower it if the model runs out of memory. Model files
+    are cached under EMBEDDING_MODEL_CACHE_DIR across runs. The
+    sentence-transformers fallback runs on a CUDA GPU when torch sees one.
+    """
+    from langchain_community.embeddings import FastEmbedEmbeddings, HuggingFaceEmbeddings
+    
+    batch_size = int(os.environ.get('RAG_EMBED_BATCH_SIZE', 64))
+    
     try:
-        print(f"  → Loading document...")
-        loader = TextLoader(str(document_path), encoding='utf-8')
-        documents = loader.load()
-        
-        if not documents:
-            print("  ✗ No documents loaded")
-            return None
-        
-        print(f"  → Creating text chunks...")
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=8000,
-            chunk_overlap=1500,
-            length_function=len,
-            separators=["\n\n", "\n", ". ", " ", ""]
+        embeddings = FastEmbedEmbeddings(
+            model_name="BAAI/bge-small-en-v1.5",
+            batch_size=batch_size,
+            cache_dir=str(EMBEDDING_MODEL_CACHE_DIR)
         )
-        
-        splits = text_splitter.split_documents(documents)
-        print(f"  ✓ Created {len(splits)} chunks")
-        
-        print(f"  → Building vector store...")
-        vectorstore = FAISS.from_documents(splits, embeddings_model)
-        retriever = vectorstore.as_retriever(search_type="similarity", search_kwargs={"k": 25})
-        
-        template = """
+        print("✓ Using FastEmbed BAAI/bge-small-en-v1.5 embeddings")
+        return embeddings
+    except ImportError:
+        pass
+    
+    device = 'cpu'
+    if importlib.util.find_spec('torch') is not None:
+        import torch
+        if torch.cuda.is_available():
+            device = 'cuda'
+    
+    embeddings = HuggingFaceEmbeddings(
+        model_name="sentence-transformers/all-MiniLM-L6-v2",
+        model_kwargs={'device': device},
+        encode_kwargs={'batch_size': batch_size},
+        cache_folder=str(EMBEDDING_MODEL_CACHE_DIR)
+    )
+    print(f"✓ Using sentence-transformers/all-MiniLM-L6-v2 embeddings ({device})")
+    return embeddings
+
+def embedding_tokenizer(embeddings_model):
+    """(tokenizer, max tokens per chunk) of a sentence-transformers model, or None when the
+    model does not expose one; chunks are then sized in tokens so none is truncated"""
+    client = getattr(embeddings_model, 'client', None)
+    tokenizer = getattr(client, 'tokenizer', None)
+    max_seq_length = getattr(client, 'max_seq_length', None)
+    if tokenizer is None or not max_seq_length:
+        return None
+    # [CLS] and [SEP] take two positions of the model's window
+    return tokenizer, max_seq_length - 2
+
+def create_text_splitter(embeddings_model) -> 'RecursiveCharacterTextSplitter':
+    """Chunk splitter sized in model tokens when the tokenizer is available, else in characters"""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    
+    separators = ["\n\n", "\n", ". ", " ", ""]
+    token_window = embedding_tokenizer(embeddings_model)
+    if token_window is not None:
+        tokenizer, max_tokens = token_window
+        return RecursiveCharacterTextSplitter.from_huggingface_tokenizer(
+            tokenizer,
+            chunk_size=max_tokens,
+            chunk_overlap=max_tokens // 4,
+            separators=separators
+        )
+    
+    return RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
+        length_function=len,
+        separators=separators
+    )
+
+def split_filing_sections(documents: List['Document']) -> List['Document']:
+    """Split documents at Item headings so no chunk spans two filing sections"""
+    from langchain_core.documents import Document
+    
+    sections = []
+    for document in documents:
+        for section in SECTION_HEADING_PATTERN.split(document.page_content):
+            if section.strip():
+                sections.append(Document(page_content=section, metadata=dict(document.metadata)))
+    return sections
+
+def create_faiss_index(vectors: 'np.ndarray'):
+    """Create and train a FAISS index for the given float32 vectors.
+
+    The index type is a faiss.index_factory description read from
+    RAG_FAISS_INDEX, e.g. "Flat" or "IVF64,PQ32", and defaults to
+    FAISS_DEFAULT_INDEX.
+    """
+    import faiss
+    
+    description = os.environ.get('RAG_FAISS_INDEX') or FAISS_DEFAULT_INDEX
+    index = faiss.index_factory(vectors.shape[1], description)
+    if not index.is_trained:
+        index.train(vectors)
+    
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = FAISS_NPROBE
+    return index
+
+def build_vector_store(splits, embeddings_model) -> 'FAISS':
+    """Embed all chunks in one batch and wrap an explicitly built index in a FAISS store"""
+    import faiss
+    import numpy as np
+    from langchain_community.vectorstores import FAISS
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    
+    texts = [split.page_content for split in splits]
+    vectors = np.asarray(embeddings_model.embed_documents(texts), dtype=np.float32)
+    
+    index = create_faiss_index(vectors)
+    index.add(vectors)
+    
+    # MMR retrieval reconstructs candidate vectors, which IVF indexes need a direct map for
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.make_direct_map()
+    
+    docstore = InMemoryDocstore({str(i): split for i, split in enumerate(splits)})
+    index_to_docstore_id = {i: str(i) for i in range(len(splits))}
+    
+    return FAISS(
+        embedding_function=embeddings_model,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=index_to_docstore_id
+    )
+
+# Extraction prompt; JSON braces are doubled because {context} is a template variable
+EXTRACTION_TEMPLATE = """
 You are a professional financial data extraction specialist for SEC 10-Q and 10-K filings.
 
 ════════════════════════════════════════════════════════════════════════════════
@@ -773,8 +1111,61 @@ REQUIREMENTS:
 
 Begin extraction:
 """
+
+@functools.lru_cache(maxsize=None)
+def get_extraction_prompt():
+    """Compile the extraction prompt once and reuse it for every filing"""
+    from langchain_core.prompts import ChatPromptTemplate
+    return ChatPromptTemplate.from_template(EXTRACTION_TEMPLATE)
+
+def vector_store_cache_path(document_path: Path, embeddings_model) -> Path:
+    """Cache directory for a document's vector store; any input that changes the index changes the key"""
+    model_id = getattr(embeddings_model, 'model_name', type(embeddings_model).__name__)
+    token_window = embedding_tokenizer(embeddings_model)
+    chunking = f"{token_window[1]} tokens" if token_window else f"{CHUNK_SIZE}|{CHUNK_OVERLAP}"
+    settings = f"{model_id}|{chunking}|{os.environ.get('RAG_FAISS_INDEX') or FAISS_DEFAULT_INDEX}"
+    digest = hashlib.blake2b(document_path.read_bytes(), digest_size=16)
+    digest.update(settings.encode('utf-8'))
+    return VECTOR_STORE_CACHE_DIR / digest.hexdigest()
+
+def build_rag_pipeline(document_path: Path, embeddings_model, llm_model):
+    """Build RAG pipeline for document analysis"""
+    try:
+        from langchain_community.document_loaders import TextLoader
+        from langchain_core.output_parsers import StrOutputParser
+        from langchain_community.vectorstores import FAISS
+        
+        cache_path = vector_store_cache_path(document_path, embeddings_model)
+        if (cache_path / 'index.faiss').is_file():
+            # Written by this tool from the same document and settings, so safe to unpickle
+            vectorstore = FAISS.load_local(str(cache_path), embeddings_model, allow_dangerous_deserialization=True)
+            print(f"  ✓ Using cached vector store ({vectorstore.index.ntotal} chunks)")
+        else:
+            print(f"  → Loading document...")
+            loader = TextLoader(str(document_path), encoding='utf-8')
+            documents = loader.load()
+            
+            if not documents:
+                print("  ✗ No documents loaded")
+                return None
+            
+            print(f"  → Creating text chunks...")
+            text_splitter = create_text_splitter(embeddings_model)
+            splits = text_splitter.split_documents(split_filing_sections(documents))
+            print(f"  ✓ Created {len(splits)} chunks")
+            
+            print(f"  → Building vector store...")
+            vectorstore = build_vector_store(splits, embeddings_model)
+            vectorstore.save_local(str(cache_path))
+        
+        # Over-fetch candidates, then keep a diverse top 60 (MMR) so the context spans
+        # production, revenue, cost and activity sections instead of near-duplicate chunks
+        retriever = vectorstore.as_retriever(
+            search_type="mmr",
+            search_kwargs={"k": 60, "fetch_k": 200, "lambda_mult": 0.5}
+        )
         
-        prompt = ChatPromptTemplate.from_template(template.replace("{", "{{").replace("}", "}}").replace("{{context}}", "{context}"))
+        prompt = get_extraction_prompt()
         
         chain = (
             {"context": retriever, "question": lambda x: x}
@@ -803,6 +1194,31 @@ REQUIRED METRICS:
 
 Return as structured JSON with all numeric values."""
 
+def unwrap_json_fence(answer: str) -> str:
+    """Return the body of a ```json fenced block; plain-JSON answers are returned unchanged"""
+    fence_start = answer.find('```json')
+    if fence_start >= 0:
+        fence_end = answer.find('```', fence_start + 7)
+        if fence_end >= 0:
+            return answer[fence_start + 7:fence_end].strip()
+    return answer
+
+def create_llm_cache(database_path: Path):
+    """SQLite LLM cache that only stores answers extract_metrics can parse as JSON,
+    so a malformed answer is retried on the next run instead of replayed"""
+    from langchain_community.cache import SQLiteCache
+    
+    class ParsedAnswerCache(SQLiteCache):
+        def update(self, prompt, llm_string, return_val):
+            try:
+                for generation in return_val:
+                    json_loads(unwrap_json_fence(generation.text))
+            except json.JSONDecodeError:
+                return
+            super().update(prompt, llm_string, return_val)
+    
+    return ParsedAnswerCache(database_path=str(database_path))
+
 def extract_metrics(rag_chain, filing_type: str) -> Dict:
     """Extract metrics using RAG pipeline"""
     try:
@@ -817,11 +1233,8 @@ def extract_metrics(rag_chain, filing_type: str) -> Dict:
         print(f"  ✓ Extraction complete ({elapsed:.1f}s)")
         
         try:
-            json_match = re.search(r'```json\s*(.*?)\s*```', result, re.DOTALL)
-            if json_match:
-                result = json_match.group(1)
-            
-            parsed = json.loads(result)
+            result = unwrap_json_fence(result)
+            parsed = json_loads(result)
             return {"success": True, "data": parsed}
             
         except json.JSONDecodeError:
@@ -835,6 +1248,9 @@ def extract_metrics(rag_chain, filing_type: str) -> Dict:
 # JSON TO EXCEL/DB PROCESSING FUNCTIONS
 # ============================================================================
 
+# First number in a value string, with optional sign, thousands separators and decimals
+NUMBER_PATTERN = re.compile(r'-?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?')
+
 def extract_numeric_value(value_str):
     """Extract numeric value from simplified format string (e.g., '148.4 MBbl/d' -> 148.4)"""
     if not isinstance(value_str, str):
@@ -844,9 +1260,15 @@ def extract_numeric_value(value_str):
         return None
     
     # Remove currency symbols and extract number
-    pattern = r'-?\d{1,3}(?:,\d{3})*(?:\.\d+)?'
     cleaned = value_str.replace('$', '').replace('%', '')
-    match = re.search(pattern, cleaned)
+    
+    # Fast path: most values start with the number ("148.4 MBbl/d", "1,234 million").
+    # The leading token must be exactly one NUMBER_PATTERN match, so both paths agree
+    parts = cleaned.split(None, 1)
+    if parts and NUMBER_PATTERN.fullmatch(parts[0]):
+        return float(parts[0].replace(',', ''))
+    
+    match = NUMBER_PATTERN.search(cleaned)
     
     if match:
         numeric_str = match.group().replace(',', '')
@@ -857,24 +1279,34 @@ def extract_numeric_value(value_str):
     
     return None
 
+# Placeholder the extraction prompt asks the LLM to use for missing metrics
+NOT_FOUND = 'Not found'
+
 def parse_simplified_value(value):
     """
     Parse value from simplified JSON format.
     Returns tuple of (numeric_value, original_string)
     Example: "148.4 MBbl/d" -> (148.4, "148.4 MBbl/d")
     """
-    if not value or value == "Not found":
+    if not value or value == NOT_FOUND:
         return (None, value)
     
     if isinstance(value, dict):
         # Old format compatibility
-        v = value.get('value', 'Not found')
-        if v == 'Not found':
-            return (None, 'Not found')
+        v = value.get('value', NOT_FOUND)
+        if v == NOT_FOUND:
+            return (None, NOT_FOUND)
         unit = value.get('unit', '')
         return (extract_numeric_value(v), f"{v} {unit}".strip())
     
     # New simplified format - value is already a string like "148.4 MBbl/d"
+    if isinstance(value, str):
+        return parse_value_string(value)
+    return (extract_numeric_value(value), value)
+
+@functools.lru_cache(maxsize=65536)
+def parse_value_string(value: str):
+    """Parse a simplified-format string; cached because the same strings recur across filings and basins"""
     return (extract_numeric_value(value), value)
 
 def get_value_from_dict(data_dict, possible_keys):
@@ -884,31 +1316,67 @@ def get_value_from_dict(data_dict, possible_keys):
             return parse_simplified_value(data_dict[key])
     return (None, None)
 
+# Field tables: (result key, JSON keys to try in order)
+PRODUCTION_FIELDS = (
+    ('oil_mbbl_per_day', ('oil_production_mbbl_per_day', 'oil_mbbl_per_day')),
+    ('ngl_mbbl_per_day', ('ngl_production_mbbl_per_day', 'ngl_mbbl_per_day')),
+    ('gas_mmcf_per_day', ('gas_production_mmcf_per_day', 'gas_mmcf_per_day')),
+    ('boe_mboe_per_day', ('total_boe_mboe_per_day', 'boe_mboe_per_day')),
+    ('oil_mmbls_total', ('oil_production_mmbl_total', 'oil_mmbls')),
+    ('ngl_mmbls_total', ('ngl_production_mmbl_total', 'ngl_mmbls')),
+    ('gas_bcf_total', ('gas_production_bcf_total', 'gas_bcf')),
+    ('boe_mmboe_total', ('total_boe_mmboe_total', 'boe_mmboe'))
+)
+
+REVENUE_FIELDS = (
+    ('oil_revenue_million', ('oil_revenue_million_usd', 'oil_revenue')),
+    ('ngl_revenue_million', ('ngl_revenue_million_usd', 'ngl_revenue')),
+    ('gas_revenue_million', ('gas_revenue_million_usd', 'gas_revenue')),
+    ('total_revenue_million', ('total_revenue_million_usd', 'total_revenue')),
+    ('revenue_per_boe', ('revenue_per_boe_usd', 'revenue_per_boe'))
+)
+
+PRICING_FIELDS = (
+    ('realized_price_oil_per_bbl', ('realized_price_oil_usd_per_bbl', 'oil_price_realized', 'oil_price_per_bbl')),
+    ('realized_price_ngl_per_bbl', ('realized_price_ngl_usd_per_bbl', 'ngl_price_realized', 'ngl_price_per_bbl')),
+    ('realized_price_gas_per_mcf', ('realized_price_gas_usd_per_mcf', 'gas_price_realized', 'gas_price_per_mcf')),
+    ('realized_price_boe', ('realized_price_boe_usd_per_boe', 'boe_price_realized', 'boe_price'))
+)
+
+# Activity and per-BOE cost fields use the same key in the JSON and the result
+ACTIVITY_FIELDS = (
+    'drilling_rigs', 'gross_wells_drilled', 'gross_wells_completed',
+    'gross_wells_til', 'net_wells_til', 'avg_lateral_length_drilled',
+    'avg_lateral_length_completed', 'working_interest_percent'
+)
+
+COST_FIELDS = (
+    'production_cost_per_boe', 'lease_operating_expense_per_boe',
+    'transportation_cost_per_boe', 'production_taxes_per_boe', 'ddna_per_boe'
+)
+
+# Capex: (result key, current JSON key, older fallback key)
+CAPEX_FIELDS = (
+    ('development_capex_million', 'development_capex_million_usd', 'development_capex'),
+    ('exploration_capex_million', 'exploration_capex_million_usd', 'exploration_capex'),
+    ('total_capex_million', 'total_capex_million_usd', 'total_capex')
+)
+
+def extract_fields(section, fields):
+    """Parse each (result key, JSON keys) field of a section once into value and _str entries"""
+    result = {}
+    for result_key, json_keys in fields:
+        num_val, str_val = get_value_from_dict(section, json_keys)
+        result[result_key] = num_val
+        result[f'{result_key}_str'] = str_val
+    return result
+
 def extract_production_data(filing_data):
     """Extract production metrics from simplified format"""
     if not filing_data or 'production' not in filing_data:
         return {}
     
-    prod = filing_data['production']
-    
-    return {
-        'oil_mbbl_per_day': get_value_from_dict(prod, ['oil_production_mbbl_per_day', 'oil_mbbl_per_day'])[0],
-        'oil_mbbl_per_day_str': get_value_from_dict(prod, ['oil_production_mbbl_per_day', 'oil_mbbl_per_day'])[1],
-        'ngl_mbbl_per_day': get_value_from_dict(prod, ['ngl_production_mbbl_per_day', 'ngl_mbbl_per_day'])[0],
-        'ngl_mbbl_per_day_str': get_value_from_dict(prod, ['ngl_production_mbbl_per_day', 'ngl_mbbl_per_day'])[1],
-        'gas_mmcf_per_day': get_value_from_dict(prod, ['gas_production_mmcf_per_day', 'gas_mmcf_per_day'])[0],
-        'gas_mmcf_per_day_str': get_value_from_dict(prod, ['gas_production_mmcf_per_day', 'gas_mmcf_per_day'])[1],
-        'boe_mboe_per_day': get_value_from_dict(prod, ['total_boe_mboe_per_day', 'boe_mboe_per_day'])[0],
-        'boe_mboe_per_day_str': get_value_from_dict(prod, ['total_boe_mboe_per_day', 'boe_mboe_per_day'])[1],
-        'oil_mmbls_total': get_value_from_dict(prod, ['oil_production_mmbl_total', 'oil_mmbls'])[0],
-        'oil_mmbls_total_str': get_value_from_dict(prod, ['oil_production_mmbl_total', 'oil_mmbls'])[1],
-        'ngl_mmbls_total': get_value_from_dict(prod, ['ngl_production_mmbl_total', 'ngl_mmbls'])[0],
-        'ngl_mmbls_total_str': get_value_from_dict(prod, ['ngl_production_mmbl_total', 'ngl_mmbls'])[1],
-        'gas_bcf_total': get_value_from_dict(prod, ['gas_production_bcf_total', 'gas_bcf'])[0],
-        'gas_bcf_total_str': get_value_from_dict(prod, ['gas_production_bcf_total', 'gas_bcf'])[1],
-        'boe_mmboe_total': get_value_from_dict(prod, ['total_boe_mmboe_total', 'boe_mmboe'])[0],
-        'boe_mmboe_total_str': get_value_from_dict(prod, ['total_boe_mmboe_total', 'boe_mmboe'])[1]
-    }
+    return extract_fields(filing_data['production'], PRODUCTION_FIELDS)
 
 def extract_activity_data(filing_data):
     """Extract activity metrics from simplified format"""
@@ -918,10 +1386,7 @@ def extract_activity_data(filing_data):
     activity = filing_data['activity']
     result = {}
     
-    # Optimize: call parse_simplified_value once per field
-    for field in ['drilling_rigs', 'gross_wells_drilled', 'gross_wells_completed', 
-                  'gross_wells_til', 'net_wells_til', 'avg_lateral_length_drilled',
-                  'avg_lateral_length_completed', 'working_interest_percent']:
+    for field in ACTIVITY_FIELDS:
         num_val, str_val = parse_simplified_value(activity.get(field, ''))
         result[field] = num_val
         result[f'{field}_str'] = str_val
@@ -933,38 +1398,14 @@ def extract_revenue_data(filing_data):
     if not filing_data or 'revenue' not in filing_data:
         return {}
     
-    revenue = filing_data['revenue']
-    
-    return {
-        'oil_revenue_million': get_value_from_dict(revenue, ['oil_revenue_million_usd', 'oil_revenue'])[0],
-        'oil_revenue_million_str': get_value_from_dict(revenue, ['oil_revenue_million_usd', 'oil_revenue'])[1],
-        'ngl_revenue_million': get_value_from_dict(revenue, ['ngl_revenue_million_usd', 'ngl_revenue'])[0],
-        'ngl_revenue_million_str': get_value_from_dict(revenue, ['ngl_revenue_million_usd', 'ngl_revenue'])[1],
-        'gas_revenue_million': get_value_from_dict(revenue, ['gas_revenue_million_usd', 'gas_revenue'])[0],
-        'gas_revenue_million_str': get_value_from_dict(revenue, ['gas_revenue_million_usd', 'gas_revenue'])[1],
-        'total_revenue_million': get_value_from_dict(revenue, ['total_revenue_million_usd', 'total_revenue'])[0],
-        'total_revenue_million_str': get_value_from_dict(revenue, ['total_revenue_million_usd', 'total_revenue'])[1],
-        'revenue_per_boe': get_value_from_dict(revenue, ['revenue_per_boe_usd', 'revenue_per_boe'])[0],
-        'revenue_per_boe_str': get_value_from_dict(revenue, ['revenue_per_boe_usd', 'revenue_per_boe'])[1]
-    }
+    return extract_fields(filing_data['revenue'], REVENUE_FIELDS)
 
 def extract_pricing_data(filing_data):
     """Extract pricing metrics from simplified format"""
     if not filing_data or 'revenue' not in filing_data:
         return {}
     
-    revenue = filing_data['revenue']
-    
-    return {
-        'realized_price_oil_per_bbl': get_value_from_dict(revenue, ['realized_price_oil_usd_per_bbl', 'oil_price_realized', 'oil_price_per_bbl'])[0],
-        'realized_price_oil_per_bbl_str': get_value_from_dict(revenue, ['realized_price_oil_usd_per_bbl', 'oil_price_realized', 'oil_price_per_bbl'])[1],
-        'realized_price_ngl_per_bbl': get_value_from_dict(revenue, ['realized_price_ngl_usd_per_bbl', 'ngl_price_realized', 'ngl_price_per_bbl'])[0],
-        'realized_price_ngl_per_bbl_str': get_value_from_dict(revenue, ['realized_price_ngl_usd_per_bbl', 'ngl_price_realized', 'ngl_price_per_bbl'])[1],
-        'realized_price_gas_per_mcf': get_value_from_dict(revenue, ['realized_price_gas_usd_per_mcf', 'gas_price_realized', 'gas_price_per_mcf'])[0],
-        'realized_price_gas_per_mcf_str': get_value_from_dict(revenue, ['realized_price_gas_usd_per_mcf', 'gas_price_realized', 'gas_price_per_mcf'])[1],
-        'realized_price_boe': get_value_from_dict(revenue, ['realized_price_boe_usd_per_boe', 'boe_price_realized', 'boe_price'])[0],
-        'realized_price_boe_str': get_value_from_dict(revenue, ['realized_price_boe_usd_per_boe', 'boe_price_realized', 'boe_price'])[1]
-    }
+    return extract_fields(filing_data['revenue'], PRICING_FIELDS)
 
 def extract_cost_data(filing_data):
     """Extract cost metrics from simplified format"""
@@ -974,43 +1415,27 @@ def extract_cost_data(filing_data):
     costs = filing_data['costs']
     result = {}
     
-    # Optimize: call parse_simplified_value once per field
-    cost_fields = [
-        ('production_cost_per_boe', 'production_cost_per_boe'),
-        ('lease_operating_expense_per_boe', 'lease_operating_expense_per_boe'),
-        ('transportation_cost_per_boe', 'transportation_cost_per_boe'),
-        ('production_taxes_per_boe', 'production_taxes_per_boe'),
-        ('ddna_per_boe', 'ddna_per_boe')
-    ]
+    for field in COST_FIELDS:
+        num_val, str_val = parse_simplified_value(costs.get(field, ''))
+        result[field] = num_val
+        result[f'{field}_str'] = str_val
     
-    for result_key, json_key in cost_fields:
-        num_val, str_val = parse_simplified_value(costs.get(json_key, ''))
+    # Handle capex fields with fallback
+    for result_key, json_key, fallback_key in CAPEX_FIELDS:
+        num_val, str_val = parse_simplified_value(costs.get(json_key, costs.get(fallback_key, '')))
         result[result_key] = num_val
         result[f'{result_key}_str'] = str_val
     
-    # Handle capex fields with fallback
-    capex_value = costs.get('development_capex_million_usd', costs.get('development_capex', ''))
-    num_val, str_val = parse_simplified_value(capex_value)
-    result['development_capex_million'] = num_val
-    result['development_capex_million_str'] = str_val
-    
-    capex_value = costs.get('exploration_capex_million_usd', costs.get('exploration_capex', ''))
-    num_val, str_val = parse_simplified_value(capex_value)
-    result['exploration_capex_million'] = num_val
-    result['exploration_capex_million_str'] = str_val
-    
-    capex_value = costs.get('total_capex_million_usd', costs.get('total_capex', ''))
-    num_val, str_val = parse_simplified_value(capex_value)
-    result['total_capex_million'] = num_val
-    result['total_capex_million_str'] = str_val
-    
     return result
 
-def parse_json_file(json_path):
-    """Parse JSON file and extract all data (updated for simplified JSON structure)"""
+def parse_json_file(json_path, data: Optional[Dict] = None):
+    """Parse JSON file and extract all data (updated for simplified JSON structure).
+    Pass data when the file's contents are already in memory to skip reading it back"""
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if data is None:
+            # Read raw bytes; the parser decodes UTF-8 itself
+            with open(json_path, 'rb') as f:
+                data = json_loads(f.read())
         
         # Handle new simplified JSON structure
         ticker = data.get('companyName', 'UNKNOWN')
@@ -1063,461 +1488,430 @@ def parse_json_file(json_path):
 # EXCEL CREATION
 # ============================================================================
 
-def create_excel_workbook(all_data, output_path):
-    """Create Excel workbook with multiple sheets - using simplified format with value+unit strings"""
-    
-    writer = pd.ExcelWriter(output_path, engine='openpyxl')
-    
-    # Sheet 1: Production Data - Company Level
-    production_records = []
-    for data in all_data:
-        record = {
-            'Ticker': data['company_info']['ticker'],
-            'Company Name': data['company_info']['company_name'],
-            'Filing Type': data['company_info']['filing_type'],
-            'Filing Date': data['company_info']['filing_date'],
-            'Time Period': data['company_info']['time_period'],
-            'Quarter': data['company_info'].get('quarter', ''),
-            'Year': data['company_info'].get('year', ''),
-            'Oil Production (MBbl/d)': data['production'].get('oil_mbbl_per_day_str', ''),
-            'Oil Production Total (MMBbl)': data['production'].get('oil_mmbls_total_str', ''),
-            'NGL Production (MBbl/d)': data['production'].get('ngl_mbbl_per_day_str', ''),
-            'NGL Production Total (MMBbl)': data['production'].get('ngl_mmbls_total_str', ''),
-            'Gas Production (MMcf/d)': data['production'].get('gas_mmcf_per_day_str', ''),
-            'Gas Production Total (Bcf)': data['production'].get('gas_bcf_total_str', ''),
-            'Total BOE (MBoe/d)': data['production'].get('boe_mboe_per_day_str', ''),
-            'Total BOE (MMBoe)': data['production'].get('boe_mmboe_total_str', '')
-        }
-        production_records.append(record)
-    
-    df_production = pd.DataFrame(production_records)
-    df_production.to_excel(writer, sheet_name='Production Data', index=False)
-    
-    # Sheet 2: Activity & Wells
-    activity_records = []
-    for data in all_data:
-        record = {
-            'Ticker': data['company_info']['ticker'],
-            'Company Name': data['company_info']['company_name'],
-            'Filing Type': data['company_info']['filing_type'],
-            'Filing Date': data['company_info']['filing_date'],
-            'Quarter': data['company_info'].get('quarter', ''),
-            'Year': data['company_info'].get('year', ''),
-            'Drilling Rigs': data['activity'].get('drilling_rigs_str', ''),
-            'Gross Wells Drilled': data['activity'].get('gross_wells_drilled_str', ''),
-            'Gross Wells Completed': data['activity'].get('gross_wells_completed_str', ''),
-            'Gross Wells TIL': data['activity'].get('gross_wells_til_str', ''),
-            'Net Wells TIL': data['activity'].get('net_wells_til_str', ''),
-            'Avg Lateral Length Drilled': data['activity'].get('avg_lateral_length_drilled_str', ''),
-            'Avg Lateral Length Completed': data['activity'].get('avg_lateral_length_completed_str', ''),
-            'Working Interest': data['activity'].get('working_interest_percent_str', '')
-        }
-        activity_records.append(record)
-    
-    df_activity = pd.DataFrame(activity_records)
-    df_activity.to_excel(writer, sheet_name='Activity & Wells', index=False)
-    
-    # Sheet 3: Revenue
-    revenue_records = []
-    for data in all_data:
-        record = {
-            'Ticker': data['company_info']['ticker'],
-            'Company Name': data['company_info']['company_name'],
-            'Filing Type': data['company_info']['filing_type'],
-            'Filing Date': data['company_info']['filing_date'],
-            'Quarter': data['company_info'].get('quarter', ''),
-            'Year': data['company_info'].get('year', ''),
-            'Oil Revenue': data['revenue'].get('oil_revenue_million_str', ''),
-            'NGL Revenue': data['revenue'].get('ngl_revenue_million_str', ''),
-            'Gas Revenue': data['revenue'].get('gas_revenue_million_str', ''),
-            'Total Revenue': data['revenue'].get('total_revenue_million_str', ''),
-            'Revenue per BOE': data['revenue'].get('revenue_per_boe_str', '')
-        }
-        revenue_records.append(record)
-    
-    df_revenue = pd.DataFrame(revenue_records)
-    df_revenue.to_excel(writer, sheet_name='Revenue', index=False)
-    
-    # Sheet 4: Realized Prices
-    pricing_records = []
-    for data in all_data:
-        record = {
-            'Ticker': data['company_info']['ticker'],
-            'Company Name': data['company_info']['company_name'],
-            'Filing Type': data['company_info']['filing_type'],
-            'Filing Date': data['company_info']['filing_date'],
-            'Quarter': data['company_info'].get('quarter', ''),
-            'Year': data['company_info'].get('year', ''),
-            'Oil Price': data['pricing'].get('realized_price_oil_per_bbl_str', ''),
-            'NGL Price': data['pricing'].get('realized_price_ngl_per_bbl_str', ''),
-            'Gas Price': data['pricing'].get('realized_price_gas_per_mcf_str', ''),
-            'BOE Price': data['pricing'].get('realized_price_boe_str', '')
-        }
-        pricing_records.append(record)
-    
-    df_pricing = pd.DataFrame(pricing_records)
-    df_pricing.to_excel(writer, sheet_name='Realized Prices', index=False)
+# Shared cell styles, built once and reused for every workbook
+HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+HEADER_FONT = Font(bold=True, color="FFFFFF", size=11)
+HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center", wrap_text=True)
+CELL_ALIGNMENT = Alignment(horizontal="left", vertical="center")
+THIN_BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+
+# xlsxwriter (optional) writes faster; otherwise openpyxl streams rows in write-only mode.
+# Either way sheets are styled as they are written, with no second load/save pass
+EXCEL_ENGINE = 'xlsxwriter' if xlsxwriter is not None else 'openpyxl'
+
+# xlsxwriter equivalents of the openpyxl styles above
+XLSX_HEADER_FORMAT = {
+    'bold': True, 'font_color': '#FFFFFF', 'font_size': 11, 'bg_color': '#366092',
+    'align': 'center', 'valign': 'vcenter', 'text_wrap': True, 'border': 1
+}
+XLSX_CELL_FORMAT = {'align': 'left', 'valign': 'vcenter', 'border': 1}
+
+# Excel columns as (header, JSON key); company columns come from company_info
+EXCEL_COMPANY_COLUMNS = (
+    ('Ticker', 'ticker'), ('CIK', 'cik'), ('Company Name', 'company_name'),
+    ('Filing Type', 'filing_type'), ('Filing Date', 'filing_date'),
+    ('Time Period', 'time_period'), ('Quarter', 'quarter'), ('Year', 'year')
+)
+EXCEL_METRIC_COLUMNS = {
+    'production': (
+        ('Oil Production (MBbl/d)', 'oil_mbbl_per_day_str'),
+        ('Oil Production Total (MMBbl)', 'oil_mmbls_total_str'),
+        ('NGL Production (MBbl/d)', 'ngl_mbbl_per_day_str'),
+        ('NGL Production Total (MMBbl)', 'ngl_mmbls_total_str'),
+        ('Gas Production (MMcf/d)', 'gas_mmcf_per_day_str'),
+        ('Gas Production Total (Bcf)', 'gas_bcf_total_str'),
+        ('Total BOE (MBoe/d)', 'boe_mboe_per_day_str'),
+        ('Total BOE (MMBoe)', 'boe_mmboe_total_str')
+    ),
+    'activity': (
+        ('Drilling Rigs', 'drilling_rigs_str'),
+        ('Gross Wells Drilled', 'gross_wells_drilled_str'),
+        ('Gross Wells Completed', 'gross_wells_completed_str'),
+        ('Gross Wells TIL', 'gross_wells_til_str'),
+        ('Net Wells TIL', 'net_wells_til_str'),
+        ('Avg Lateral Length Drilled', 'avg_lateral_length_drilled_str'),
+        ('Avg Lateral Length Completed', 'avg_lateral_length_completed_str'),
+        ('Working Interest', 'working_interest_percent_str')
+    ),
+    'revenue': (
+        ('Oil Revenue', 'oil_revenue_million_str'),
+        ('NGL Revenue', 'ngl_revenue_million_str'),
+        ('Gas Revenue', 'gas_revenue_million_str'),
+        ('Total Revenue', 'total_revenue_million_str'),
+        ('Revenue per BOE', 'revenue_per_boe_str')
+    ),
+    'pricing': (
+        ('Oil Price', 'realized_price_oil_per_bbl_str'),
+        ('NGL Price', 'realized_price_ngl_per_bbl_str'),
+        ('Gas Price', 'realized_price_gas_per_mcf_str'),
+        ('BOE Price', 'realized_price_boe_str')
+    ),
+    'costs': (
+        ('Production Cost per BOE', 'production_cost_per_boe_str'),
+        ('LOE per BOE', 'lease_operating_expense_per_boe_str'),
+        ('Transportation Cost per BOE', 'transportation_cost_per_boe_str'),
+        ('Production Taxes per BOE', 'production_taxes_per_boe_str'),
+        ('Development CapEx', 'development_capex_million_str'),
+        ('Exploration CapEx', 'exploration_capex_million_str'),
+        ('Total CapEx', 'total_capex_million_str'),
+        ('DD&A per BOE', 'ddna_per_boe_str')
+    )
+}
+
+# Company columns of the Production Data and Basin Production sheets
+EXCEL_PERIOD_COLUMNS = ('Ticker', 'Company Name', 'Filing Type', 'Filing Date', 'Time Period', 'Quarter', 'Year')
+EXCEL_BASIN_COLUMNS = (
+    ('Oil Production (MBbl/d)', 'oil_production_mbbl_per_day'),
+    ('Oil Production Total (MMBbl)', 'oil_production_mmbl_total'),
+    ('NGL Production (MBbl/d)', 'ngl_production_mbbl_per_day'),
+    ('NGL Production Total (MMBbl)', 'ngl_production_mmbl_total'),
+    ('Gas Production (MMcf/d)', 'gas_production_mmcf_per_day'),
+    ('Gas Production Total (Bcf)', 'gas_production_bcf_total'),
+    ('Total BOE (MBoe/d)', 'total_boe_mboe_per_day'),
+    ('Total BOE (MMBoe)', 'total_boe_mmboe_total')
+)
+
+# Filing-level sheets as (sheet name, columns) selected from the flattened filing rows
+EXCEL_FILING_COLUMNS = ('Ticker', 'Company Name', 'Filing Type', 'Filing Date', 'Quarter', 'Year')
+EXCEL_METRIC_SHEETS = (
+    ('Production Data', EXCEL_PERIOD_COLUMNS + tuple(h for h, _ in EXCEL_METRIC_COLUMNS['production'])),
+    ('Activity & Wells', EXCEL_FILING_COLUMNS + tuple(h for h, _ in EXCEL_METRIC_COLUMNS['activity'])),
+    ('Revenue', EXCEL_FILING_COLUMNS + tuple(h for h, _ in EXCEL_METRIC_COLUMNS['revenue'])),
+    ('Realized Prices', EXCEL_FILING_COLUMNS + tuple(h for h, _ in EXCEL_METRIC_COLUMNS['pricing'])),
+    ('Costs', EXCEL_FILING_COLUMNS + tuple(h for h, _ in EXCEL_METRIC_COLUMNS['costs']))
+)
+EXCEL_SUMMARY_COLUMNS = ('Ticker', 'CIK', 'Company Name', 'Filing Type', 'Filing Date', 'Time Period')
+
+# Row layouts of the filing and basin row tuples. parse_json_file always fills
+# every company_info key, so company columns are read with one itemgetter call
+EXCEL_COMPANY_VALUES = itemgetter(*(key for _, key in EXCEL_COMPANY_COLUMNS))
+EXCEL_PERIOD_VALUES = itemgetter(*(dict(EXCEL_COMPANY_COLUMNS)[header] for header in EXCEL_PERIOD_COLUMNS))
+EXCEL_FILING_ROW_COLUMNS = tuple(header for header, _ in EXCEL_COMPANY_COLUMNS) + tuple(
+    header for columns in EXCEL_METRIC_COLUMNS.values() for header, _ in columns
+)
+EXCEL_BASIN_ROW_COLUMNS = EXCEL_PERIOD_COLUMNS + ('Basin Name',) + tuple(header for header, _ in EXCEL_BASIN_COLUMNS)
+
+def excel_column_widths(headers, rows):
+    """Column widths fitted to the longest header/value, minimum 15, maximum 60"""
+    return [
+        min(max(max(len(str(value)) for value in column if value is not None) + 3, 15), 60)
+        for column in zip(headers, *rows)
+    ]
+
+def select_columns(rows, row_columns, columns):
+    """Project row tuples laid out as row_columns onto the given columns"""
+    getter = itemgetter(*(row_columns.index(column) for column in columns))
+    return [getter(row) for row in rows]
+
+def styled_cell(ws, value, font=None, fill=None, alignment=None, border=None):
+    """Write-only cell carrying the shared style objects"""
+    cell = WriteOnlyCell(ws, value=value)
+    if font is not None:
+        cell.font = font
+    if fill is not None:
+        cell.fill = fill
+    cell.alignment = alignment
+    cell.border = border
+    return cell
+
+def write_excel_sheet(writer, sheet_name, headers, rows, formats=None):
+    """Write header + row tuples to a sheet with header/cell styling applied as it is written"""
+    widths = excel_column_widths(headers, rows)
+    
+    if formats is None:
+        # openpyxl write-only workbook: widths and panes must be set before rows are streamed
+        ws = writer.create_sheet(sheet_name)
+        for col_idx, width in enumerate(widths, 1):
+            ws.column_dimensions[get_column_letter(col_idx)].width = width
+        ws.freeze_panes = 'A2'
+        ws.auto_filter.ref = f"A1:{get_column_letter(len(headers))}{len(rows) + 1}"
+        
+        ws.append([styled_cell(ws, header, HEADER_FONT, HEADER_FILL, HEADER_ALIGNMENT, THIN_BORDER)
+                   for header in headers])
+        for row in rows:
+            ws.append([styled_cell(ws, value, alignment=CELL_ALIGNMENT, border=THIN_BORDER) if value else None
+                       for value in row])
+        return
     
-    # Sheet 5: Costs
-    cost_records = []
+    header_format, cell_format = formats
+    ws = writer.add_worksheet(sheet_name)
+    for col_idx, width in enumerate(widths):
+        ws.set_column(col_idx, col_idx, width)
+    ws.write_row(0, 0, headers, header_format)
+    for row_idx, row in enumerate(rows, 1):
+        # Like the openpyxl path, only cells with a value are written and styled
+        for col_idx, value in enumerate(row):
+            if value:
+                ws.write(row_idx, col_idx, value, cell_format)
+    ws.freeze_panes(1, 0)
+    ws.autofilter(0, 0, len(rows), len(headers) - 1)
+
+def iter_filing_rows(all_data):
+    """Flatten each filing into one row (EXCEL_FILING_ROW_COLUMNS order) for every filing-level sheet"""
     for data in all_data:
-        record = {
-            'Ticker': data['company_info']['ticker'],
-            'Company Name': data['company_info']['company_name'],
-            'Filing Type': data['company_info']['filing_type'],
-            'Filing Date': data['company_info']['filing_date'],
-            'Quarter': data['company_info'].get('quarter', ''),
-            'Year': data['company_info'].get('year', ''),
-            'Production Cost per BOE': data['costs'].get('production_cost_per_boe_str', ''),
-            'LOE per BOE': data['costs'].get('lease_operating_expense_per_boe_str', ''),
-            'Transportation Cost per BOE': data['costs'].get('transportation_cost_per_boe_str', ''),
-            'Production Taxes per BOE': data['costs'].get('production_taxes_per_boe_str', ''),
-            'Development CapEx': data['costs'].get('development_capex_million_str', ''),
-            'Exploration CapEx': data['costs'].get('exploration_capex_million_str', ''),
-            'Total CapEx': data['costs'].get('total_capex_million_str', ''),
-            'DD&A per BOE': data['costs'].get('ddna_per_boe_str', '')
-        }
-        cost_records.append(record)
-    
-    df_costs = pd.DataFrame(cost_records)
-    df_costs.to_excel(writer, sheet_name='Costs', index=False)
-    
-    # Sheet 6: Basin Production Data (Detailed) - Using simplified format
-    basin_records = []
+        company_info = data['company_info']
+        row = list(EXCEL_COMPANY_VALUES(company_info))
+        for section, columns in EXCEL_METRIC_COLUMNS.items():
+            values = data[section]
+            row += [values.get(key, '') for _, key in columns]
+        yield tuple(row)
+
+def iter_basin_rows(all_data):
+    """One row per basin (EXCEL_BASIN_ROW_COLUMNS order), with the filing's company columns"""
     for data in all_data:
-        basins_dict = data.get('basins', {})
+        company_row = EXCEL_PERIOD_VALUES(data['company_info'])
         
-        for basin_name, basin_data in basins_dict.items():
+        for basin_name, basin_data in data.get('basins', {}).items():
             if not isinstance(basin_data, dict):
                 continue
             
             # In simplified format, basin data is directly stored as value+unit strings
-            record = {
-                'Ticker': data['company_info']['ticker'],
-                'Company Name': data['company_info']['company_name'],
-                'Filing Type': data['company_info']['filing_type'],
-                'Filing Date': data['company_info']['filing_date'],
-                'Time Period': data['company_info']['time_period'],
-                'Quarter': data['company_info'].get('quarter', ''),
-                'Year': data['company_info'].get('year', ''),
-                'Basin Name': basin_name,
-                'Oil Production (MBbl/d)': basin_data.get('oil_production_mbbl_per_day', 'Not found'),
-                'Oil Production Total (MMBbl)': basin_data.get('oil_production_mmbl_total', 'Not found'),
-                'NGL Production (MBbl/d)': basin_data.get('ngl_production_mbbl_per_day', 'Not found'),
-                'NGL Production Total (MMBbl)': basin_data.get('ngl_production_mmbl_total', 'Not found'),
-                'Gas Production (MMcf/d)': basin_data.get('gas_production_mmcf_per_day', 'Not found'),
-                'Gas Production Total (Bcf)': basin_data.get('gas_production_bcf_total', 'Not found'),
-                'Total BOE (MBoe/d)': basin_data.get('total_boe_mboe_per_day', 'Not found'),
-                'Total BOE (MMBoe)': basin_data.get('total_boe_mmboe_total', 'Not found')
-            }
-            basin_records.append(record)
-    
-    if basin_records:
-        df_basins = pd.DataFrame(basin_records)
-        df_basins.to_excel(writer, sheet_name='Basin Production', index=False)
-    
-    # Sheet 7: Company Summary
-    summary_records = []
-    for data in all_data:
-        record = {
-            'Ticker': data['company_info']['ticker'],
-            'CIK': data['company_info']['cik'],
-            'Company Name': data['company_info']['company_name'],
-            'Filing Type': data['company_info']['filing_type'],
-            'Filing Date': data['company_info']['filing_date'],
-            'Time Period': data['company_info']['time_period']
-        }
-        summary_records.append(record)
-    
-    df_summary = pd.DataFrame(summary_records)
-    df_summary.to_excel(writer, sheet_name='Company Summary', index=False)
+            yield company_row + (basin_name,) + tuple(
+                basin_data.get(key, NOT_FOUND) for _, key in EXCEL_BASIN_COLUMNS
+            )
+
+def create_excel_workbook(all_data, output_path):
+    """Create Excel workbook with multiple sheets - using simplified format with value+unit strings"""
     
-    writer.close()
-    format_excel_workbook(output_path)
+    if EXCEL_ENGINE == 'xlsxwriter':
+        # Rows are written strictly in order, so each one is flushed to disk as it is written
+        writer = xlsxwriter.Workbook(str(output_path), {'constant_memory': True})
+        formats = (writer.add_format(XLSX_HEADER_FORMAT), writer.add_format(XLSX_CELL_FORMAT))
+    else:
+        writer = Workbook(write_only=True)
+        formats = None
     
-    print(f"✅ Excel file created: {output_path}")
-
-def format_excel_workbook(file_path):
-    """Apply formatting to Excel with proper column widths to prevent truncation"""
-    wb = load_workbook(file_path)
+    # Sheets 1-5: Production, Activity & Wells, Revenue, Realized Prices, Costs
+    filing_rows = list(iter_filing_rows(all_data))
+    for sheet_name, columns in EXCEL_METRIC_SHEETS:
+        rows = select_columns(filing_rows, EXCEL_FILING_ROW_COLUMNS, columns)
+        write_excel_sheet(writer, sheet_name, columns, rows, formats)
     
-    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF", size=11)
-    header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    cell_alignment = Alignment(horizontal="left", vertical="center")
+    # Sheet 6: Basin Production Data (Detailed) - Using simplified format
+    basin_rows = list(iter_basin_rows(all_data))
+    if basin_rows:
+        write_excel_sheet(writer, 'Basin Production', EXCEL_BASIN_ROW_COLUMNS, basin_rows, formats)
     
-    border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
+    # Sheet 7: Company Summary
+    rows = select_columns(filing_rows, EXCEL_FILING_ROW_COLUMNS, EXCEL_SUMMARY_COLUMNS)
+    write_excel_sheet(writer, 'Company Summary', EXCEL_SUMMARY_COLUMNS, rows, formats)
     
-    for sheet_name in wb.sheetnames:
-        ws = wb[sheet_name]
-        
-        # Format header row
-        for cell in ws[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = header_alignment
-            cell.border = border
-        
-        # Auto-size columns with minimum width to prevent truncation
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            
-            for cell in column:
-                try:
-                    if cell.value:
-                        # Calculate length properly
-                        cell_length = len(str(cell.value))
-                        max_length = max(max_length, cell_length)
-                        
-                        # Apply cell alignment for data cells
-                        if cell.row > 1:
-                            cell.alignment = cell_alignment
-                            cell.border = border
-                except:
-                    pass
-            
-            # Set column width with proper padding, minimum 15, maximum 60
-            adjusted_width = min(max(max_length + 3, 15), 60)
-            ws.column_dimensions[column_letter].width = adjusted_width
-        
-        # Freeze top row for easy scrolling
-        ws.freeze_panes = 'A2'
+    if formats is None:
+        writer.save(output_path)
+    else:
+        writer.close()
     
-    wb.save(file_path)
+    print(f"✅ Excel file created: {output_path}")
 
 # ============================================================================
 # DATABASE INSERTION
 # ============================================================================
 
-def check_duplicate_filing(company_name: str, filing_type: str, filing_date: str, conn) -> bool:
+def find_duplicate_filings(ticker: str, filings, cursor) -> set:
     """
-    Check if a filing already exists in the database.
-    Returns True if duplicate exists, False otherwise.
+    Return which (filing_type, filing_date) pairs of a company are already in the
+    database, checked in one query on the caller's cursor. Keyed like the
+    UNIQUE(ticker, filing_date, filing_type) constraint, so the lookup is served by its index.
+    Dates come back as 'YYYY-MM-DD' (like EDGAR's) whatever the server's DateStyle.
     """
+    if not filings:
+        return set()
+    
     try:
-        cursor = conn.cursor()
         cursor.execute("""
-            SELECT COUNT(*) FROM company_summary
-            WHERE company_name = %s AND filing_type = %s AND filing_date = %s
-        """, (company_name, filing_type, filing_date))
-        
-        count = cursor.fetchone()[0]
-        cursor.close()
+            SELECT filing_type, to_char(filing_date, 'YYYY-MM-DD') FROM company_summary
+            WHERE ticker = %s AND (filing_type, filing_date) IN %s
+        """, (ticker, tuple(filings)))
         
-        return count > 0
+        return set(cursor.fetchall())
     except psycopg2.Error as e:
-        print(f"⚠️  Error checking for duplicate: {e}")
-        return False
+        print(f"⚠️  Error checking for duplicates: {e}")
+        cursor.connection.rollback()
+        return set()
+
+# Metric tables keyed per filing: (table, parsed section, extra key columns,
+# ((db column, parsed metric key), ...)). Each metric is stored twice: the
+# as-reported text ("148.4 MBbl/d") and its numeric value in <column>_value.
+FILING_KEY_COLUMNS = ('ticker', 'company_name', 'filing_type', 'filing_date', 'quarter', 'year')
+FILING_KEY_VALUES = itemgetter(*FILING_KEY_COLUMNS)
+
+# company_summary columns, all read straight from company_info
+COMPANY_SUMMARY_VALUES = itemgetter('ticker', 'cik', 'company_name', 'filing_type', 'filing_date', 'time_period')
+
+FILING_METRIC_TABLES = (
+    ('production_data', 'production', ('time_period',), (
+        ('oil_mbbl_per_day', 'oil_mbbl_per_day'),
+        ('ngl_mbbl_per_day', 'ngl_mbbl_per_day'),
+        ('gas_mmcf_per_day', 'gas_mmcf_per_day'),
+        ('boe_mboe_per_day', 'boe_mboe_per_day'),
+        ('oil_mmbls_total', 'oil_mmbls_total'),
+        ('ngl_mmbls_total', 'ngl_mmbls_total'),
+        ('gas_bcf_total', 'gas_bcf_total'),
+        ('boe_mmboe_total', 'boe_mmboe_total')
+    )),
+    ('activity_wells', 'activity', (), (
+        ('drilling_rigs', 'drilling_rigs'),
+        ('gross_wells_drilled', 'gross_wells_drilled'),
+        ('gross_wells_completed', 'gross_wells_completed'),
+        ('gross_wells_til', 'gross_wells_til'),
+        ('net_wells_til', 'net_wells_til'),
+        ('avg_lateral_length_drilled', 'avg_lateral_length_drilled'),
+        ('avg_lateral_length_completed', 'avg_lateral_length_completed'),
+        ('working_interest_percent', 'working_interest_percent')
+    )),
+    ('revenue_data', 'revenue', (), (
+        ('oil_revenue', 'oil_revenue_million'),
+        ('ngl_revenue', 'ngl_revenue_million'),
+        ('gas_revenue', 'gas_revenue_million'),
+        ('total_revenue', 'total_revenue_million'),
+        ('revenue_per_boe', 'revenue_per_boe')
+    )),
+    ('realized_prices', 'pricing', (), (
+        ('oil_price', 'realized_price_oil_per_bbl'),
+        ('ngl_price', 'realized_price_ngl_per_bbl'),
+        ('gas_price', 'realized_price_gas_per_mcf'),
+        ('boe_price', 'realized_price_boe')
+    )),
+    ('cost_data', 'costs', (), (
+        ('production_cost_per_boe', 'production_cost_per_boe'),
+        ('lease_operating_expense_per_boe', 'lease_operating_expense_per_boe'),
+        ('transportation_cost_per_boe', 'transportation_cost_per_boe'),
+        ('production_taxes_per_boe', 'production_taxes_per_boe'),
+        ('development_capex', 'development_capex_million'),
+        ('exploration_capex', 'exploration_capex_million'),
+        ('total_capex', 'total_capex_million'),
+        ('ddna_per_boe', 'ddna_per_boe')
+    ))
+)
+
+# Basin columns: (db column, key in the basin JSON)
+BASIN_KEY_COLUMNS = ('ticker', 'company_name', 'sec_filing_date', 'file_type', 'basin_name')
+
+BASIN_METRIC_COLUMNS = (
+    ('gas_reserves', 'gas_production_bcf_total'),
+    ('gas_per_day', 'gas_production_mmcf_per_day'),
+    ('oil_reserves', 'oil_production_mmbl_total'),
+    ('oil_per_day', 'oil_production_mbbl_per_day'),
+    ('ngl_reserves', 'ngl_production_mmbl_total'),
+    ('ngl_per_day', 'ngl_production_mbbl_per_day'),
+    ('total_boe', 'total_boe_mmboe_total'),
+    ('boe_per_day', 'total_boe_mboe_per_day')
+)
+
+def build_upsert_sql(table: str, key_columns, metric_columns, conflict_columns) -> str:
+    """Build a multi-row INSERT ... ON CONFLICT DO UPDATE statement for execute_values.
+
+    Only the text and numeric metric columns are updated on conflict.
+    """
+    update_columns = list(metric_columns) + [f"{column}_value" for column in metric_columns]
+    columns = list(key_columns) + update_columns
+    updates = ",\n    ".join(f"{column} = EXCLUDED.{column}" for column in update_columns)
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)})\n"
+        f"VALUES %s\n"
+        f"ON CONFLICT ({', '.join(conflict_columns)}) DO UPDATE\n"
+        f"SET {updates}"
+    )
+
+FILING_UPSERT_SQL = {
+    table: build_upsert_sql(
+        table,
+        FILING_KEY_COLUMNS + extra_columns,
+        [column for column, _ in metrics],
+        ('ticker', 'filing_date', 'filing_type')
+    )
+    for table, _, extra_columns, metrics in FILING_METRIC_TABLES
+}
+
+BASIN_UPSERT_SQL = build_upsert_sql(
+    'basin_data',
+    BASIN_KEY_COLUMNS,
+    [column for column, _ in BASIN_METRIC_COLUMNS],
+    ('ticker', 'sec_filing_date', 'file_type', 'basin_name')
+)
+
+def clean_db_value(value):
+    """Convert 'Not found' or empty values to NULL"""
+    return None if not value or value == NOT_FOUND else value
 
 def insert_data_to_database(all_data, conn):
     """Insert parsed data into PostgreSQL database with duplicate check"""
     
-    # Helper function to clean values for database insertion
-    def clean_val(val):
-        """Convert 'Not found' or empty values to NULL"""
-        return None if not val or val == 'Not found' else val
-    
     try:
         cursor = conn.cursor()
         inserted_count = 0
-        skipped_count = 0
+        skipped = []
+        
+        # Company Summary first: rows that conflict are existing filings and come back
+        # missing from RETURNING, so duplicates are detected by the insert itself.
+        # to_char matches the EDGAR 'YYYY-MM-DD' keys whatever the server's DateStyle
+        summary_rows = [COMPANY_SUMMARY_VALUES(data['company_info']) for data in all_data]
+        new_filings = set()
+        if summary_rows:
+            new_filings = set(execute_values(cursor, """
+                INSERT INTO company_summary (ticker, cik, company_name, filing_type, filing_date, time_period)
+                VALUES %s
+                ON CONFLICT (ticker, filing_date, filing_type) DO NOTHING
+                RETURNING ticker, filing_type, to_char(filing_date, 'YYYY-MM-DD')
+            """, summary_rows, page_size=500, fetch=True))
+        
+        metric_rows = {table: [] for table in FILING_UPSERT_SQL}
+        basin_rows = []
         
         for data in all_data:
-            ticker = data['company_info']['ticker']
-            company_name = data['company_info']['company_name']
-            cik = data['company_info']['cik']
-            filing_type = data['company_info']['filing_type']
-            filing_date = data['company_info']['filing_date']
-            time_period = data['company_info']['time_period']
+            company_info = data['company_info']
+            key_values = FILING_KEY_VALUES(company_info)
+            ticker, company_name, filing_type, filing_date = key_values[:4]
             
-            # Check for duplicate before insertion
-            if check_duplicate_filing(company_name, filing_type, filing_date, conn):
-                print(f"⚠️  Skipping duplicate: {company_name} - {filing_type} - {filing_date}")
-                skipped_count += 1
+            # Taking the key out also marks a repeat within the batch as a duplicate
+            if (ticker, filing_type, filing_date) not in new_filings:
+                skipped.append(f"{company_name} - {filing_type} - {filing_date}")
                 continue
+            new_filings.discard((ticker, filing_type, filing_date))
             
-            # Insert Company Summary
-            cursor.execute("""
-                INSERT INTO company_summary (ticker, cik, company_name, filing_type, filing_date, time_period)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                ON CONFLICT (ticker, filing_date, filing_type) DO UPDATE
-                SET cik = EXCLUDED.cik, company_name = EXCLUDED.company_name, time_period = EXCLUDED.time_period
-            """, (ticker, cik, company_name, filing_type, filing_date, time_period))
+            # Metric tables (as-reported text + numeric value per metric)
+            for table, section, extra_columns, metrics in FILING_METRIC_TABLES:
+                values = data[section]
+                row = list(key_values)
+                row += [company_info[column] for column in extra_columns]
+                row += [clean_db_value(values.get(f'{key}_str')) for _, key in metrics]
+                row += [values.get(key) for _, key in metrics]
+                metric_rows[table].append(row)
             
-            # Insert Production Data (Combined Value+Unit Strings)
-            prod = data['production']
-            quarter = data['company_info'].get('quarter', '')
-            year = data['company_info'].get('year', '')
-            
-            cursor.execute("""
-                INSERT INTO production_data 
-                (ticker, company_name, filing_type, filing_date, time_period, quarter, year,
-                oil_mbbl_per_day, ngl_mbbl_per_day, gas_mmcf_per_day, boe_mboe_per_day,
-                oil_mmbls_total, ngl_mmbls_total, gas_bcf_total, boe_mmboe_total)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (ticker, filing_date, filing_type) DO UPDATE
-                SET oil_mbbl_per_day = EXCLUDED.oil_mbbl_per_day,
-                    ngl_mbbl_per_day = EXCLUDED.ngl_mbbl_per_day,
-                    gas_mmcf_per_day = EXCLUDED.gas_mmcf_per_day,
-                    boe_mboe_per_day = EXCLUDED.boe_mboe_per_day,
-                    oil_mmbls_total = EXCLUDED.oil_mmbls_total,
-                    ngl_mmbls_total = EXCLUDED.ngl_mmbls_total,
-                    gas_bcf_total = EXCLUDED.gas_bcf_total,
-                    boe_mmboe_total = EXCLUDED.boe_mmboe_total
-            """, (ticker, company_name, filing_type, filing_date, time_period, quarter, year,
-                  clean_val(prod.get('oil_mbbl_per_day_str')), clean_val(prod.get('ngl_mbbl_per_day_str')),
-                  clean_val(prod.get('gas_mmcf_per_day_str')), clean_val(prod.get('boe_mboe_per_day_str')),
-                  clean_val(prod.get('oil_mmbls_total_str')), clean_val(prod.get('ngl_mmbls_total_str')),
-                  clean_val(prod.get('gas_bcf_total_str')), clean_val(prod.get('boe_mmboe_total_str'))))
-            
-            # Insert Activity Data (Combined Value+Unit Strings)
-            activity = data['activity']
-            cursor.execute("""
-                INSERT INTO activity_wells
-                (ticker, company_name, filing_type, filing_date, quarter, year,
-                drilling_rigs, gross_wells_drilled, gross_wells_completed, gross_wells_til, net_wells_til,
-                avg_lateral_length_drilled, avg_lateral_length_completed, working_interest_percent)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (ticker, filing_date, filing_type) DO UPDATE
-                SET drilling_rigs = EXCLUDED.drilling_rigs,
-                    gross_wells_drilled = EXCLUDED.gross_wells_drilled,
-                    gross_wells_completed = EXCLUDED.gross_wells_completed,
-                    gross_wells_til = EXCLUDED.gross_wells_til,
-                    net_wells_til = EXCLUDED.net_wells_til,
-                    avg_lateral_length_drilled = EXCLUDED.avg_lateral_length_drilled,
-                    avg_lateral_length_completed = EXCLUDED.avg_lateral_length_completed,
-                    working_interest_percent = EXCLUDED.working_interest_percent
-            """, (ticker, company_name, filing_type, filing_date, quarter, year,
-                  clean_val(activity.get('drilling_rigs_str')),
-                  clean_val(activity.get('gross_wells_drilled_str')),
-                  clean_val(activity.get('gross_wells_completed_str')),
-                  clean_val(activity.get('gross_wells_til_str')),
-                  clean_val(activity.get('net_wells_til_str')),
-                  clean_val(activity.get('avg_lateral_length_drilled_str')),
-                  clean_val(activity.get('avg_lateral_length_completed_str')),
-                  clean_val(activity.get('working_interest_percent_str'))))
-            
-            # Insert Revenue Data (Combined Value+Unit Strings)
-            revenue = data['revenue']
-            cursor.execute("""
-                INSERT INTO revenue_data
-                (ticker, company_name, filing_type, filing_date, quarter, year,
-                oil_revenue, ngl_revenue, gas_revenue, total_revenue, revenue_per_boe)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (ticker, filing_date, filing_type) DO UPDATE
-                SET oil_revenue = EXCLUDED.oil_revenue,
-                    ngl_revenue = EXCLUDED.ngl_revenue,
-                    gas_revenue = EXCLUDED.gas_revenue,
-                    total_revenue = EXCLUDED.total_revenue,
-                    revenue_per_boe = EXCLUDED.revenue_per_boe
-            """, (ticker, company_name, filing_type, filing_date, quarter, year,
-                  clean_val(revenue.get('oil_revenue_million_str')),
-                  clean_val(revenue.get('ngl_revenue_million_str')),
-                  clean_val(revenue.get('gas_revenue_million_str')),
-                  clean_val(revenue.get('total_revenue_million_str')),
-                  clean_val(revenue.get('revenue_per_boe_str'))))
-            
-            # Insert Pricing Data (Combined Value+Unit Strings)
-            pricing = data['pricing']
-            cursor.execute("""
-                INSERT INTO realized_prices
-                (ticker, company_name, filing_type, filing_date, quarter, year,
-                oil_price, ngl_price, gas_price, boe_price)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (ticker, filing_date, filing_type) DO UPDATE
-                SET oil_price = EXCLUDED.oil_price,
-                    ngl_price = EXCLUDED.ngl_price,
-                    gas_price = EXCLUDED.gas_price,
-                    boe_price = EXCLUDED.boe_price
-            """, (ticker, company_name, filing_type, filing_date, quarter, year,
-                  clean_val(pricing.get('realized_price_oil_per_bbl_str')),
-                  clean_val(pricing.get('realized_price_ngl_per_bbl_str')),
-                  clean_val(pricing.get('realized_price_gas_per_mcf_str')),
-                  clean_val(pricing.get('realized_price_boe_str'))))
-            
-            # Insert Cost Data (Combined Value+Unit Strings)
-            costs = data['costs']
-            cursor.execute("""
-                INSERT INTO cost_data
-                (ticker, company_name, filing_type, filing_date, quarter, year,
-                production_cost_per_boe, lease_operating_expense_per_boe, 
-                transportation_cost_per_boe, production_taxes_per_boe,
-                development_capex, exploration_capex, total_capex, ddna_per_boe)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (ticker, filing_date, filing_type) DO UPDATE
-                SET production_cost_per_boe = EXCLUDED.production_cost_per_boe,
-                    lease_operating_expense_per_boe = EXCLUDED.lease_operating_expense_per_boe,
-                    transportation_cost_per_boe = EXCLUDED.transportation_cost_per_boe,
-                    production_taxes_per_boe = EXCLUDED.production_taxes_per_boe,
-                    development_capex = EXCLUDED.development_capex,
-                    exploration_capex = EXCLUDED.exploration_capex,
-                    total_capex = EXCLUDED.total_capex,
-                    ddna_per_boe = EXCLUDED.ddna_per_boe
-            """, (ticker, company_name, filing_type, filing_date, quarter, year,
-                  clean_val(costs.get('production_cost_per_boe_str')),
-                  clean_val(costs.get('lease_operating_expense_per_boe_str')),
-                  clean_val(costs.get('transportation_cost_per_boe_str')),
-                  clean_val(costs.get('production_taxes_per_boe_str')),
-                  clean_val(costs.get('development_capex_million_str')),
-                  clean_val(costs.get('exploration_capex_million_str')),
-                  clean_val(costs.get('total_capex_million_str')),
-                  clean_val(costs.get('ddna_per_boe_str'))))
-            
-            # Insert Basin Production Data - store combined value+unit strings directly
+            # Basin Production Data
             basins_dict = data.get('basins', {})
             
             for basin_name, basin_data in basins_dict.items():
                 if not isinstance(basin_data, dict):
                     continue
                 
-                # Get combined strings directly from JSON (no parsing needed!)
-                gas_reserves = basin_data.get('gas_production_bcf_total', 'Not found')
-                gas_per_day = basin_data.get('gas_production_mmcf_per_day', 'Not found')
-                oil_reserves = basin_data.get('oil_production_mmbl_total', 'Not found')
-                oil_per_day = basin_data.get('oil_production_mbbl_per_day', 'Not found')
-                ngl_reserves = basin_data.get('ngl_production_mmbl_total', 'Not found')
-                ngl_per_day = basin_data.get('ngl_production_mbbl_per_day', 'Not found')
-                total_boe = basin_data.get('total_boe_mmboe_total', 'Not found')
-                boe_per_day = basin_data.get('total_boe_mboe_per_day', 'Not found')
-                
-                cursor.execute("""
-                    INSERT INTO basin_data
-                    (ticker, company_name, sec_filing_date, file_type, basin_name,
-                     gas_reserves, gas_per_day,
-                     oil_reserves, oil_per_day,
-                     ngl_reserves, ngl_per_day,
-                     total_boe, boe_per_day)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (ticker, sec_filing_date, file_type, basin_name) DO UPDATE
-                    SET gas_reserves = EXCLUDED.gas_reserves,
-                        gas_per_day = EXCLUDED.gas_per_day,
-                        oil_reserves = EXCLUDED.oil_reserves,
-                        oil_per_day = EXCLUDED.oil_per_day,
-                        ngl_reserves = EXCLUDED.ngl_reserves,
-                        ngl_per_day = EXCLUDED.ngl_per_day,
-                        total_boe = EXCLUDED.total_boe,
-                        boe_per_day = EXCLUDED.boe_per_day
-                """, (ticker, company_name, filing_date, filing_type, basin_name,
-                      clean_val(gas_reserves), clean_val(gas_per_day),
-                      clean_val(oil_reserves), clean_val(oil_per_day),
-                      clean_val(ngl_reserves), clean_val(ngl_per_day),
-                      clean_val(total_boe), clean_val(boe_per_day)))
+                basin_values = [basin_data.get(key, NOT_FOUND) for _, key in BASIN_METRIC_COLUMNS]
+                row = [ticker, company_name, filing_date, filing_type, basin_name]
+                row += [clean_db_value(value) for value in basin_values]
+                row += [parse_simplified_value(value)[0] for value in basin_values]
+                basin_rows.append(row)
             
             inserted_count += 1
         
+        # One multi-row INSERT per table for the whole batch
+        for table, rows in metric_rows.items():
+            if rows:
+                execute_values(cursor, FILING_UPSERT_SQL[table], rows, page_size=500)
+        if basin_rows:
+            execute_values(cursor, BASIN_UPSERT_SQL, basin_rows, page_size=500)
+        
         conn.commit()
         cursor.close()
         
         if inserted_count > 0:
             print(f"✅ Data inserted into database successfully ({inserted_count} records)")
-        if skipped_count > 0:
-            print(f"⚠️  Skipped {skipped_count} duplicate record(s)")
+        if skipped:
+            print(f"⚠️  Skipped {len(skipped)} duplicate record(s): {'; '.join(skipped)}")
         
         return True
         
@@ -1605,95 +1999,151 @@ def select_filings(filings_10q: List[Dict], filings_10k: List[Dict]) -> Tuple[Op
 # MAIN EXECUTION
 # ============================================================================
 
-def save_output_file(data: Dict, company_name: str, output_dir: Path):
-    """Save results to separate JSON files for each filing type with simplified structure"""
+# Characters dropped from the company name when building output filenames
+FILENAME_STRIP_TABLE = str.maketrans('', '', ' ,.')
+
+def get_worker_setting() -> int:
+    """Read RAG_WORKERS (filings processed in parallel); 1, sequential, when unset or not a whole number"""
+    value = os.environ.get('RAG_WORKERS', '').strip()
+    if not value:
+        return 1
+    try:
+        workers = int(value)
+    except ValueError:
+        print(f"⚠️  Ignoring RAG_WORKERS={value!r} (not a whole number); processing filings one at a time\n")
+        return 1
+    if workers < 1:
+        print(f"⚠️  RAG_WORKERS={workers} is below 1; using 1\n")
+        return 1
+    return workers
+
+def save_output_file(data: Dict, company_name: str, output_dir: Path,
+                     clean_company_name: Optional[str] = None):
+    """Save results to separate JSON files for each filing type with simplified structure;
+    returns (path, saved JSON data) pairs"""
     saved_files = []
+    if clean_company_name is None:
+        clean_company_name = company_name.translate(FILENAME_STRIP_TABLE)
+    
+    # Company-level fields are the same for every filing
+    company = data.get('company', {})
+    ticker = company.get('ticker', 'UNKNOWN')
+    cik = company.get('cik', '')
+    extraction_date = data.get('extraction_date')
     
     for filing_type, filing_info in data.get('filings', {}).items():
+        # A 'text' result is LLM output extract_metrics already failed to parse as JSON,
+        # so it is saved as the string it is rather than parsed a second time
         result = filing_info.get('extraction_result', {})
-        data_field = result.get('data')
-        
-        if isinstance(data_field, str) and result.get('format') == 'text':
-            try:
-                result['data'] = json.loads(data_field)
-                del result['format']
-            except json.JSONDecodeError:
-                pass
         
         # Create separate JSON for this filing
         filing_date = filing_info.get('filing_date', 'unknown')
-        # Clean company name for filename (remove spaces, special chars)
-        clean_company_name = company_name.replace(' ', '').replace(',', '').replace('.', '')
         output_filename = f"{clean_company_name}_{filing_type}_{filing_date}.json"
         output_path = output_dir / output_filename
         
-        ticker = data.get('company', {}).get('ticker', 'UNKNOWN')
-        
         # Create individual filing JSON structure with NEW SIMPLIFIED FORMAT
         individual_filing_data = {
             "companyName": ticker,
             "companyFullName": company_name,
-            "cik": data.get('company', {}).get('cik', ''),
+            "cik": cik,
             "fileType": filing_type,
             "secFilingDate": filing_date,
             "accessionNumber": filing_info.get('accession'),
             "documentUrl": filing_info.get('document_url'),
-            "extractionDate": data.get('extraction_date'),
+            "extractionDate": extraction_date,
             "data": result.get('data', {}) if result.get('success') else {}
         }
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(individual_filing_data, f, indent=2)
+        # Serialize first, then write in one call (json.dump writes chunk by chunk)
+        output_path.write_bytes(json_dumps_bytes(individual_filing_data))
         
         print(f"✅ JSON saved: {output_path}")
-        saved_files.append(output_path)
+        saved_files.append((output_path, individual_filing_data))
     
     return saved_files
 
-def main():
-    """Main execution function"""
+def process_filing(fetcher: SECFilingFetcher, filing_type: str, filing: Dict, ticker: str,
+                   embeddings, llm) -> Dict:
+    """Fetch, extract and analyze one filing; returns its entry for the results JSON"""
+    print(f"\n{'='*80}")
+    print(f"PROCESSING {filing_type} - Filed on {filing['date']}")
+    print(f"{'='*80}\n")
+    
+    filing_data = {
+        "filing_date": filing['date'],
+        "accession": filing['accession'],
+        "document_url": None,
+        "extraction_result": {"success": False, "error": "Not processed"}
+    }
     
-    print_header()
+    doc_url = fetcher.get_filing_document_url(filing['documents_url'], filing_type)
+    if not doc_url:
+        print(f"❌ Could not get document URL")
+        filing_data['extraction_result'] = {"success": False, "error": "Could not get document URL"}
+        return filing_data
     
-    # Obtain database credentials (optional) and connect
-    conn = None
-    db_enabled = False
-    # If environment variables provide full config, use them silently
-    env_full = all([
-        os.environ.get('PGHOST') or os.environ.get('POSTGRES_HOST'),
-        os.environ.get('PGPORT') or os.environ.get('POSTGRES_PORT'),
-        os.environ.get('PGDATABASE') or os.environ.get('POSTGRES_DB'),
-        os.environ.get('PGUSER') or os.environ.get('POSTGRES_USER'),
-        os.environ.get('PGPASSWORD') or os.environ.get('POSTGRES_PASSWORD')
-    ])
-    config = None
-    if env_full:
-        config = {
-            "host": os.environ.get('PGHOST') or os.environ.get('POSTGRES_HOST'),
-            "port": int(os.environ.get('PGPORT') or os.environ.get('POSTGRES_PORT') or 5432),
-            "database": os.environ.get('PGDATABASE') or os.environ.get('POSTGRES_DB'),
-            "user": os.environ.get('PGUSER') or os.environ.get('POSTGRES_USER'),
-            "password": os.environ.get('PGPASSWORD') or os.environ.get('POSTGRES_PASSWORD')
-        }
-    else:
-        config = prompt_db_credentials()
+    filing_data['document_url'] = doc_url
+    
+    print(f"\n[1/3] Extracting text from {filing_type}...")
+    text_filename = f"{ticker}_{filing_type}_{filing['date']}.txt"
+    text_path = DIRS['extracted'] / text_filename
+    
+    if not extract_text_from_url(doc_url, text_path):
+        filing_data['extraction_result'] = {"success": False, "error": "Text extraction failed"}
+        return filing_data
+    
+    print(f"\n[2/3] Building RAG pipeline...")
+    rag_chain = build_rag_pipeline(text_path, embeddings, llm)
+    
+    if not rag_chain:
+        filing_data['extraction_result'] = {"success": False, "error": "RAG pipeline failed"}
+        return filing_data
+    
+    print(f"\n[3/3] Extracting metrics...")
+    extraction_result = extract_metrics(rag_chain, filing_type)
+    
+    filing_data['extraction_result'] = extraction_result
+    return filing_data
 
-    if config:
-        print("🔌 Testing database connection...")
-        conn = get_db_connection(config)
-        if conn:
-            db_enabled = True
-            print("✅ Database connection successful\n")
+def export_filing_json(json_path: Path, clean_company: str, conn=None,
+                       filing_json: Optional[Dict] = None) -> Optional[Path]:
+    """Create the Excel workbook for a saved filing JSON and insert it into the database
+    when a connection is given; returns the workbook path"""
+    print(f"\n📊 Processing data from: {json_path.name}")
+    # The data just written by save_output_file is reused instead of read back from disk
+    parsed_data = parse_json_file(json_path, filing_json)
+    
+    if not parsed_data:
+        print(f"⚠️  Could not parse JSON file: {json_path.name}")
+        return None
+    
+    # Create Excel file for this filing
+    filing_type = parsed_data['company_info']['filing_type']
+    filing_date = parsed_data['company_info']['filing_date']
+    excel_filename = f"{clean_company}_{filing_type}_{filing_date}.xlsx"
+    # Save Excel to output folder
+    excel_path = DIRS['output'] / excel_filename
+    
+    print(f"\n📈 Creating Excel workbook...")
+    create_excel_workbook([parsed_data], excel_path)
+    
+    # Insert into database if enabled
+    if conn is not None:
+        print(f"\n💾 Inserting data into PostgreSQL database...")
+        if insert_data_to_database([parsed_data], conn):
+            print("✅ Data successfully stored in database")
         else:
-            print("⚠️  Proceeding without database. Excel files will still be generated.\n")
+            print("⚠️  Excel created but database insertion failed")
     
-    # Create database tables
-    if db_enabled:
-        print("📊 Creating database tables...")
-        if not create_database_tables(conn):
-            print("❌ Failed to create database tables")
-            conn.close()
-            sys.exit(1)
+    return excel_path
+
+def main():
+    """Main execution function"""
+    
+    print_header()
+    
+    # Validate env-driven settings before any models, connections or downloads
+    max_workers = get_worker_setting()
     
     # Check OpenAI configuration
     use_azure = bool(os.getenv('AZURE_OPENAI_ENDPOINT'))
@@ -1713,12 +2163,16 @@ def main():
     
     print("🤖 Initializing AI models...")
     try:
+        from langchain_openai import ChatOpenAI, AzureChatOpenAI
+        from langchain_core.globals import set_llm_cache
+        
         if use_azure:
             llm = AzureChatOpenAI(
                 api_key=os.getenv('AZURE_OPENAI_API_KEY'),
                 azure_endpoint=os.getenv('AZURE_OPENAI_ENDPOINT'),
                 azure_deployment=os.getenv('AZURE_OPENAI_DEPLOYMENT'),
                 api_version=os.getenv('AZURE_OPENAI_API_VERSION', '2024-02-15-preview'),
+                temperature=0,
                 request_timeout=180
             )
             print(f"✓ Using Azure OpenAI")
@@ -1730,24 +2184,67 @@ def main():
             )
             print("✓ Using OpenAI gpt-4o-mini")
         
-        embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2",
-            model_kwargs={'device': 'cpu'}
-        )
+        embeddings = load_embeddings_model()
+        
+        # Identical prompt + retrieved context (same filing) is answered from disk on re-runs
+        set_llm_cache(create_llm_cache(DIRS['cache'] / 'llm_cache.sqlite'))
         print("✓ Models initialized successfully\n")
     except Exception as e:
         print(f"❌ Failed to initialize models: {e}")
-        conn.close()
         sys.exit(1)
     
+    # Obtain database credentials (optional) and connect
+    conn = None
+    db_enabled = False
+    # If environment variables provide full config, use them silently
+    env_full = all([
+        os.environ.get('PGHOST') or os.environ.get('POSTGRES_HOST'),
+        os.environ.get('PGPORT') or os.environ.get('POSTGRES_PORT'),
+        os.environ.get('PGDATABASE') or os.environ.get('POSTGRES_DB'),
+        os.environ.get('PGUSER') or os.environ.get('POSTGRES_USER'),
+        os.environ.get('PGPASSWORD') or os.environ.get('POSTGRES_PASSWORD')
+    ])
+    config = None
+    if env_full:
+        config = {
+            "host": os.environ.get('PGHOST') or os.environ.get('POSTGRES_HOST'),
+            "port": int(os.environ.get('PGPORT') or os.environ.get('POSTGRES_PORT') or 5432),
+            "database": os.environ.get('PGDATABASE') or os.environ.get('POSTGRES_DB'),
+            "user": os.environ.get('PGUSER') or os.environ.get('POSTGRES_USER'),
+            "password": os.environ.get('PGPASSWORD') or os.environ.get('POSTGRES_PASSWORD')
+        }
+    else:
+        config = prompt_db_credentials()
+
+    if config:
+        print("🔌 Testing database connection...")
+        conn = get_db_connection(config)
+        if conn:
+            db_enabled = True
+            print("✅ Database connection successful\n")
+        else:
+            print("⚠️  Proceeding without database. Excel files will still be generated.\n")
+    
+    # Create database tables
+    if db_enabled:
+        print("📊 Creating database tables...")
+        if not create_database_tables(conn):
+            print("❌ Failed to create database tables")
+            conn.close()
+            sys.exit(1)
+    
     # Company and filing selection
     ticker, cik, company_name = get_company_selection()
     
     print("🔍 Fetching available filings from SEC EDGAR...")
     fetcher = SECFilingFetcher(cik, ticker)
     
-    filings_10q = fetcher.get_filings_list("10-Q", count=10)
-    filings_10k = fetcher.get_filings_list("10-K", count=5)
+    # Both listings are independent requests, so fetch them concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        future_10q = executor.submit(fetcher.get_filings_list, "10-Q", 10)
+        future_10k = executor.submit(fetcher.get_filings_list, "10-K", 5)
+        filings_10q = future_10q.result()
+        filings_10k = future_10k.result()
     
     if not filings_10q and not filings_10k:
         print("\n❌ No filings found")
@@ -1783,102 +2280,67 @@ def main():
     if selected_10k:
         filings_to_process.append(("10-K", selected_10k))
     
-    # Process each filing (check for duplicates first)
+    # Check for duplicates first (only if DB enabled); the connection stays on this thread
+    duplicate_filings = set()
+    if db_enabled:
+        cursor = conn.cursor()
+        duplicate_filings = find_duplicate_filings(
+            ticker, [(filing_type, filing['date']) for filing_type, filing in filings_to_process], cursor
+        )
+        cursor.close()
+    
+    pending_filings = []
     for filing_type, filing in filings_to_process:
-        print(f"\n{'='*80}")
-        print(f"PROCESSING {filing_type} - Filed on {filing['date']}")
-        print(f"{'='*80}\n")
-        
-        # Check if this filing already exists in database (only if DB enabled)
-        if db_enabled and check_duplicate_filing(company_name, filing_type, filing['date'], conn):
+        if (filing_type, filing['date']) in duplicate_filings:
             print(f"⚠️  Filing already exists in database: {company_name} - {filing_type} - {filing['date']}")
             print(f"⚠️  Skipping extraction for this filing.\n")
             continue
-        
-        filing_data = {
-            "filing_date": filing['date'],
-            "accession": filing['accession'],
-            "document_url": None,
-            "extraction_result": {"success": False, "error": "Not processed"}
-        }
-        
-        doc_url = fetcher.get_filing_document_url(filing['documents_url'], filing_type)
-        if not doc_url:
-            print(f"❌ Could not get document URL")
-            filing_data['extraction_result'] = {"success": False, "error": "Could not get document URL"}
-            results['filings'][filing_type] = filing_data
-            continue
-        
-        filing_data['document_url'] = doc_url
-        
-        print(f"\n[1/3] Extracting text from {filing_type}...")
-        text_filename = f"{ticker}_{filing_type}_{filing['date']}.txt"
-        text_path = DIRS['extracted'] / text_filename
-        
-        if not extract_text_from_url(doc_url, text_path):
-            filing_data['extraction_result'] = {"success": False, "error": "Text extraction failed"}
-            results['filings'][filing_type] = filing_data
-            continue
-        
-        print(f"\n[2/3] Building RAG pipeline...")
-        rag_chain = build_rag_pipeline(text_path, embeddings, llm)
-        
-        if not rag_chain:
-            filing_data['extraction_result'] = {"success": False, "error": "RAG pipeline failed"}
-            results['filings'][filing_type] = filing_data
-            continue
-        
-        print(f"\n[3/3] Extracting metrics...")
-        extraction_result = extract_metrics(rag_chain, filing_type)
-        
-        filing_data['extraction_result'] = extraction_result
-        results['filings'][filing_type] = filing_data
+        pending_filings.append((filing_type, filing))
     
-    # Save JSON files (separate file per filing type)
-    print("\n" + "="*80)
-    print("SAVING RESULTS")
-    print("="*80 + "\n")
-    
-    if not results['filings']:
+    if not pending_filings:
         print("⚠️  No filings were processed (all may have been duplicates or failed)")
-        conn.close()
+        if conn:
+            conn.close()
         return
     
-    # Save JSON alongside the script (current working directory)
-    json_paths = save_output_file(results, company_name, Path.cwd())
-    
-    # Parse each JSON file and create Excel + insert to DB
-    all_parsed_data = []
+    # Company name without spaces/punctuation, shared by the JSON and Excel filenames
+    clean_company = company_name.translate(FILENAME_STRIP_TABLE)
+    # JSON is saved alongside the script (current working directory)
+    json_dir = Path.cwd()
+    json_paths = []
     excel_paths = []
     
-    for json_path in json_paths:
-        print(f"\n📊 Processing data from: {json_path.name}")
-        parsed_data = parse_json_file(json_path)
+    # Filings are processed one at a time on this thread by default, so each filing's progress
+    # log reads as one block. RAG_WORKERS > 1 processes them concurrently (their logs then
+    # interleave). Either way each finished filing is saved, exported and stored right away
+    # on this thread, which owns the DB connection
+    workers = min(max_workers, len(pending_filings))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        if workers > 1:
+            futures = [
+                (filing_type, executor.submit(process_filing, fetcher, filing_type, filing, ticker, embeddings, llm))
+                for filing_type, filing in pending_filings
+            ]
+            filing_outputs = ((filing_type, future.result()) for filing_type, future in futures)
+        else:
+            filing_outputs = (
+                (filing_type, process_filing(fetcher, filing_type, filing, ticker, embeddings, llm))
+                for filing_type, filing in pending_filings
+            )
         
-        if parsed_data:
-            all_parsed_data.append(parsed_data)
+        for filing_type, filing_output in filing_outputs:
+            filing_results = {**results, 'filings': {filing_type: filing_output}}
             
-            # Create Excel file for this filing
-            filing_type = parsed_data['company_info']['filing_type']
-            filing_date = parsed_data['company_info']['filing_date']
-            clean_company = company_name.replace(' ', '').replace(',', '').replace('.', '')
-            excel_filename = f"{clean_company}_{filing_type}_{filing_date}.xlsx"
-            # Save Excel to output folder
-            excel_path = DIRS['output'] / excel_filename
+            print("\n" + "="*80)
+            print(f"SAVING {filing_type} RESULTS")
+            print("="*80 + "\n")
             
-            print(f"\n📈 Creating Excel workbook...")
-            create_excel_workbook([parsed_data], excel_path)
-            excel_paths.append(excel_path)
-            
-            # Insert into database if enabled
-            if db_enabled:
-                print(f"\n💾 Inserting data into PostgreSQL database...")
-                if insert_data_to_database([parsed_data], conn):
-                    print("✅ Data successfully stored in database")
-                else:
-                    print("⚠️  Excel created but database insertion failed")
-        else:
-            print(f"⚠️  Could not parse JSON file: {json_path.name}")
+            for json_path, filing_json in save_output_file(filing_results, company_name, json_dir, clean_company):
+                json_paths.append(json_path)
+                excel_path = export_filing_json(json_path, clean_company, conn if db_enabled else None,
+                                                filing_json)
+                if excel_path:
+                    excel_paths.append(excel_path)
     
     if conn:
         conn.close()
@@ -1895,7 +2357,7 @@ def main():
         print(f"   • Database: Connected and updated")
     else:
         print(f"   • Database: Skipped")
-    print(f"\n   Total files processed: {len(all_parsed_data)}")
+    print(f"\n   Total files processed: {len(excel_paths)}")
     print("\n" + "="*80 + "\n")
     print("✅ Excel files have been successfully saved in the 'output' folder.")
 